@@ -1,10 +1,280 @@
-"""Pure-Python Dijkstra and A* (no networkx helpers)."""
+"""Dijkstra, A* and bidirectional Dijkstra over a CSR index of the graph.
+
+The searches run as numba kernels (which release the GIL) when numba is
+installed and as pure-Python loops over the same arrays otherwise; no
+networkx helpers are used.
+"""
 
 from __future__ import annotations
 
-import heapq
+import itertools
 import math
-from typing import Any, Dict, List, Tuple
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - optional dependency
+    njit = None  # type: ignore
+
+_INDEX_LOCK = threading.Lock()
+
+def _edge_weight(data: Dict[str, Any]) -> float:
+    """
+    Kenarın sayısal ağırlığı: önce 'weight' (bizim değiştirdiğimiz), yoksa 'length'.
+    İlk okumada float olarak data["_w"] içine yazılır; 'weight'/'blocked'
+    değiştiren kod bu anahtarı silerek önbelleği geçersiz kılar.
+    """
+    w = data.get("_w")
+    if w is None:
+        w = data["_w"] = float(data.get("weight", data.get("length", 1.0)))
+    return w
+
+class _SearchBuffers:
+    """
+    Tekrarlanan aramalar için |V| boyutlu kalıcı diziler (dist/parents ve yığın).
+    Bir hücre yalnızca damgası (gen_dist/gen_settled) güncel nesle eşitse
+    geçerlidir; her arama nesli bir artırarak dizileri O(1)'de "temizler".
+    """
+
+    __slots__ = ("dist", "parents", "gen_dist", "gen_settled", "keys", "nodes", "pos", "gen")
+
+    def __init__(self, n: int) -> None:
+        self.dist = np.empty(n, dtype=np.float64)
+        self.parents = np.empty(n, dtype=np.int64)
+        self.gen_dist = np.zeros(n, dtype=np.int32)
+        self.gen_settled = np.zeros(n, dtype=np.int32)
+        self.keys = np.empty(n, dtype=np.float64)
+        self.nodes = np.empty(n, dtype=np.int64)
+        self.pos = np.full(n, -1, dtype=np.int64)
+        self.gen = 0
+
+    def next_gen(self) -> int:
+        self.gen += 1
+        if self.gen == np.iinfo(np.int32).max:
+            # Taşma: damgaları sıfırla, nesil sayımına baştan başla
+            self.gen_dist.fill(0)
+            self.gen_settled.fill(0)
+            self.gen = 1
+        return self.gen
+
+    def settled_mask(self) -> np.ndarray:
+        return self.gen_settled == self.gen
+
+class GraphIndex:
+    """
+    Grafiğin arama için düz dizilere (SoA + CSR) çevrilmiş hali.
+    Düğümler 0..n-1 tamsayılarıyla numaralanır; her düğümün çıkan kenarları
+    indices/weights/blocked dizilerinde indptr[i]:indptr[i+1] aralığındadır.
+    open_weights, engelli kenarları inf yapılmış weights kopyasıdır; böylece
+    hasara uyan/uymayan aramalar kenar başına engel dalı olmadan yalnızca
+    hangi ağırlık dizisini kullanacaklarını seçer.
+    Geri arama için aynı kenarlar hedefe göre de (rindptr/rindices) dizilir;
+    redge, ters kaydın ileri dizideki kenar konumunu verir.
+    """
+
+    __slots__ = (
+        "node_ids",
+        "id_to_idx",
+        "node_x",
+        "node_y",
+        "indptr",
+        "indices",
+        "weights",
+        "open_weights",
+        "blocked",
+        "rindptr",
+        "rindices",
+        "redge",
+        "_lists",
+        "_buffers",
+        "_h_memo",
+    )
+
+    @classmethod
+    def of(cls, G: Any) -> "GraphIndex":
+        """Grafiğe iliştirilmiş indeksi döndürür, yoksa kurar."""
+        index = G.graph.get("_index")
+        if index is None:
+            # Eşzamanlı ilk aramalar indeksi iki kez kurmasın
+            with _INDEX_LOCK:
+                index = G.graph.get("_index")
+                while index is None:
+                    # Kurulum (iş parçacığında) GUI'deki hasar/sıfırlamayla yarışabilir:
+                    # o sırada gelen değişiklik yamalanacak indeks bulamaz, yalnızca
+                    # _index_dirty'yi işaretler. İndeks saklandıktan sonra işaret hâlâ
+                    # temizse sonraki değişiklikler onu yerinde günceller; değilse eski
+                    # kenar verisini yansıtıyor olabilir, düşürüp yeniden kurulur.
+                    G.graph["_index_dirty"] = False
+                    index = G.graph["_index"] = cls.build(G)
+                    if G.graph["_index_dirty"]:
+                        G.graph.pop("_index", None)
+                        index = None
+        return index
+
+    @classmethod
+    def build(cls, G: Any) -> "GraphIndex":
+        self = cls()
+        self.node_ids = list(G.nodes)
+        self.id_to_idx = {node: i for i, node in enumerate(self.node_ids)}
+        n = len(self.node_ids)
+        self.node_x = np.fromiter(
+            (float(data.get("x", 0.0)) for _, data in G.nodes(data=True)), dtype=np.float64, count=n
+        )
+        self.node_y = np.fromiter(
+            (float(data.get("y", 0.0)) for _, data in G.nodes(data=True)), dtype=np.float64, count=n
+        )
+
+        id_to_idx = self.id_to_idx
+        dst: List[int] = []
+        weights: List[float] = []
+        blocked: List[bool] = []
+        row_ends: List[int] = []
+        # networkx'in iç yapısı G._adj doğrudan gezilir (özel API): {u: {v: veri}},
+        # çoklu grafikte {u: {v: {anahtar: veri}}}. Satırlar düğüm sırasıyla
+        # üretildiğinden ayrıca sıralama gerekmez; yönsüz grafikte her kenar
+        # iki ucun komşuluğunda da bulunduğundan iki yön kendiliğinden eklenir.
+        multi = G.is_multigraph()
+        adj = G._adj
+        for u in self.node_ids:
+            for v, edge_data in adj[u].items():
+                vi = id_to_idx[v]
+                for data in edge_data.values() if multi else (edge_data,):
+                    dst.append(vi)
+                    weights.append(_edge_weight(data))
+                    blocked.append(bool(data.get("blocked", False)))
+            row_ends.append(len(dst))
+
+        self.indices = np.asarray(dst, dtype=np.int64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.blocked = np.asarray(blocked, dtype=np.uint8)
+        self.open_weights = np.where(self.blocked != 0, np.inf, self.weights)
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        self.indptr[1:] = row_ends
+        src_arr = np.repeat(np.arange(n, dtype=np.int64), np.diff(self.indptr))
+
+        rorder = np.argsort(self.indices, kind="stable")
+        self.rindices = src_arr[rorder]
+        self.redge = rorder.astype(np.int64)
+        self.rindptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.indices, minlength=n), out=self.rindptr[1:])
+
+        self._lists = None
+        self._buffers = []
+        self._h_memo = None
+        return self
+
+    def acquire_buffers(self) -> _SearchBuffers:
+        """Boştaki arama tamponunu verir; eşzamanlı aramalar için yenisini açar."""
+        try:
+            return self._buffers.pop()
+        except IndexError:
+            return _SearchBuffers(len(self.node_ids))
+
+    def release_buffers(self, buffers: _SearchBuffers) -> None:
+        self._buffers.append(buffers)
+
+    def search_weights(self, ignore_damage: bool) -> np.ndarray:
+        """Aramanın kullanacağı ağırlık dizisi (hasar yok sayılıyorsa ham ağırlıklar)."""
+        return self.weights if ignore_damage else self.open_weights
+
+    def as_lists(self) -> Dict[str, List[Any]]:
+        """Saf Python döngüleri için dizilerin liste kopyaları (tek sefer)."""
+        if self._lists is None:
+            self._lists = {
+                name: getattr(self, name).tolist()
+                for name in (
+                    "indptr",
+                    "indices",
+                    "weights",
+                    "open_weights",
+                    "rindptr",
+                    "rindices",
+                    "redge",
+                    "node_x",
+                    "node_y",
+                )
+            }
+        return self._lists
+
+    def heuristic_memo(self, t: int) -> Dict[int, float]:
+        """
+        Hedef t için hesaplanan sezgisel değerlerin sözlüğü. Koordinatlar hasarla
+        değişmediğinden aynı hedefe giden aramalar (ör. hasar sonrası) paylaşır.
+        """
+        memo = self._h_memo
+        if memo is None or memo[0] != t:
+            memo = self._h_memo = (t, {})
+        return memo[1]
+
+    def set_blocked(self, G: Any, u: Any, v: Any, blocked: bool) -> None:
+        """
+        u->v kenarlarının engel bitini yerinde değiştirir ve ağırlıklarını kenar
+        verisinden yeniden okur. Paralel kenarlar satırda G._adj[u][v] sırasıyla durur.
+        """
+        ui = self.id_to_idx[u]
+        lo, hi = int(self.indptr[ui]), int(self.indptr[ui + 1])
+        slots = (lo + np.flatnonzero(self.indices[lo:hi] == self.id_to_idx[v])).tolist()
+        edge_data = G._adj[u][v]
+        datas = edge_data.values() if G.is_multigraph() else (edge_data,)
+        lists = self._lists
+        for k, data in zip(slots, datas):
+            w = _edge_weight(data)
+            open_w = float('inf') if blocked else w
+            self.blocked[k] = blocked
+            self.weights[k] = w
+            self.open_weights[k] = open_w
+            if lists is not None:
+                lists["weights"][k] = w
+                lists["open_weights"][k] = open_w
+
+def set_blocked(G: Any, u: Any, v: Any, blocked: bool = True) -> None:
+    """
+    Kenar verisi ('blocked'/'weight') güncellendikten sonra çağrılır: indeks varsa
+    yeniden kurulmak yerine yalnızca ilgili kenarların maskesi güncellenir.
+    """
+    set_blocked_pairs(G, ((u, v),), blocked)
+
+def set_blocked_pairs(G: Any, pairs: Iterable[Tuple[Any, Any]], blocked: bool = True) -> None:
+    """
+    set_blocked'un çok çiftli hali: her (u, v) çiftinin maskesi ve ağırlıkları
+    indekste yerinde güncellenir, sürüm bir kez ilerletilir. Engel kaldırma
+    (hasar sıfırlama) da bu yoldan geçer; indeks iki yönde de yeniden kurulmaz.
+    """
+    # İşaret indeks okunmadan önce konur; sıralama için GraphIndex.of'a bakın
+    G.graph["_index_dirty"] = True
+    index = G.graph.get("_index")
+    if index is not None:
+        for u, v in pairs:
+            index.set_blocked(G, u, v, blocked)
+    bump_version(G)
+
+def invalidate_index(G: Any) -> None:
+    """Kenar ağırlığı/engel durumu değişince önbellekteki indeksi düşürür."""
+    G.graph["_index_dirty"] = True
+    G.graph.pop("_index", None)
+    bump_version(G)
+
+# Sürüm numaraları tüm grafikler arasında tekildir; böylece çöpe giden bir
+# grafiğin id()'si yeni bir grafiğe verilse bile eski önbellek kayıtları eşleşmez.
+_VERSION_COUNTER = itertools.count(1)
+
+def graph_version(G: Any) -> int:
+    """Grafiğin güncel sürümü (ilk çağrıda atanır)."""
+    version = G.graph.get("_version")
+    if version is None:
+        version = G.graph["_version"] = next(_VERSION_COUNTER)
+    return version
+
+def bump_version(G: Any) -> None:
+    """Kenar engel/ağırlık durumu değişince sürümü ilerletir; önbellekteki sonuçlar geçersiz olur."""
+    G.graph["_version"] = next(_VERSION_COUNTER)
 
 def get_best_edge_weight(G: Any, u: Any, v: Any, ignore_damage: bool) -> float:
     """
@@ -16,31 +286,23 @@ def get_best_edge_weight(G: Any, u: Any, v: Any, ignore_damage: bool) -> float:
         return float('inf')
 
     best_weight = float('inf')
-    found_passable = False
 
-    # Tüm paralel kenarları (varsa) kontrol et, en iyisini seç
-    for key, data in edge_data.items():
-        # 1. Hasar Kontrolü: Eğer hasar varsa ve hasarı görmezden gelmiyorsak, bu kenarı atla
+    # Tüm paralel kenarları (varsa) kontrol et, en iyisini seç.
+    # Hasarlı yolların weight'i inf olabilir, karşılaştırma bunu zaten eler.
+    for data in edge_data.values() if G.is_multigraph() else (edge_data,):
+        # Hasar yok sayılmıyorsa engelli kenarı atla
         if not ignore_damage and data.get("blocked", False):
             continue
-        
-        # 2. Ağırlık Okuma: Önce 'weight' (bizim değiştirdiğimiz), yoksa 'length'
-        # Hasarlı yolların weight'i inf olabilir, bunu dikkate almalıyız.
-        w = float(data.get("weight", data.get("length", 1.0)))
-        
+        w = _edge_weight(data)
         if w < best_weight:
             best_weight = w
-            found_passable = True
 
-    # Eğer tüm yollar kapalıysa veya yol yoksa sonsuz dön
-    if not found_passable:
-        return float('inf')
-        
     return best_weight
 
 def _node_xy(G: Any, node: Any) -> Tuple[float, float]:
-    data = G.nodes[node]
-    return float(data.get("x", 0.0)), float(data.get("y", 0.0))
+    index = GraphIndex.of(G)
+    i = index.id_to_idx[node]
+    return float(index.node_x[i]), float(index.node_y[i])
 
 def heuristic(G: Any, u: Any, v: Any) -> float:
     """
@@ -63,51 +325,375 @@ def _reconstruct_path(parents: Dict[Any, Any], end: Any) -> List[Any]:
     path.reverse()
     return path
 
+class IndexedHeap:
+    """
+    Konum tablolu ikili min-yığın (decrease-key destekli).
+    Her düğüm yığında en fazla bir kez bulunur; mesafe iyileşince yeni kayıt
+    eklemek yerine mevcut kaydın anahtarı düşürülür. Böylece yığın O(E)
+    yerine O(V) boyutta kalır ve bayat kayıt ayıklamaya gerek kalmaz.
+    """
+
+    __slots__ = ("heap", "pos")
+
+    def __init__(self) -> None:
+        self.heap: List[Tuple[float, Any]] = []
+        self.pos: Dict[Any, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def peek_key(self) -> float:
+        return self.heap[0][0]
+
+    def push_or_decrease(self, node: Any, key: float) -> None:
+        i = self.pos.get(node)
+        if i is None:
+            self.heap.append((key, node))
+            self.pos[node] = len(self.heap) - 1
+            self._sift_up(len(self.heap) - 1)
+        elif key < self.heap[i][0]:
+            self.heap[i] = (key, node)
+            self._sift_up(i)
+
+    def pop_min(self) -> Tuple[float, Any]:
+        heap = self.heap
+        top = heap[0]
+        last = heap.pop()
+        del self.pos[top[1]]
+        if heap:
+            heap[0] = last
+            self.pos[last[1]] = 0
+            self._sift_down(0)
+        return top
+
+    def _sift_up(self, i: int) -> None:
+        heap, pos = self.heap, self.pos
+        item = heap[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            p_item = heap[parent]
+            if item[0] >= p_item[0]:
+                break
+            heap[i] = p_item
+            pos[p_item[1]] = i
+            i = parent
+        heap[i] = item
+        pos[item[1]] = i
+
+    def _sift_down(self, i: int) -> None:
+        heap, pos = self.heap, self.pos
+        n = len(heap)
+        item = heap[i]
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            right = child + 1
+            if right < n and heap[right][0] < heap[child][0]:
+                child = right
+            c_item = heap[child]
+            if item[0] <= c_item[0]:
+                break
+            heap[i] = c_item
+            pos[c_item[1]] = i
+            i = child
+        heap[i] = item
+        pos[item[1]] = i
+
+def _nearest_settled(index: GraphIndex, settled: Any, target: int) -> int:
+    # Hedefe kuş uçuşu en yakın kesinleşmiş düğüm (Fallback için).
+    # settled, düğüm başına bir baytlık işaret dizisidir (bytearray ya da uint8).
+    # Yalnızca sıralama gerektiği için karekök alınmaz (kare mesafe monoton).
+    idxs = np.flatnonzero(np.frombuffer(settled, dtype=np.uint8))
+    dx = index.node_x[idxs] - index.node_x[target]
+    dy = index.node_y[idxs] - index.node_y[target]
+    return int(idxs[np.argmin(dx * dx + dy * dy)])
+
+# --- Numba çekirdekleri -------------------------------------------------------
+# Aşağıdaki fonksiyonlar yalnızca düz diziler üzerinde çalışır; numba varsa
+# modül yüklenirken @njit ile derlenir. Yığın, IndexedHeap'in dizi tabanlı
+# karşılığıdır (keys/nodes + pos), heapq derlenemediği için elle yazılmıştır.
+# Kapasite |V|'dir (decrease-key sayesinde her düğüm en fazla bir kez yığında)
+# ve ekleme başına tuple üretilmez. Saf Python yolunda aynı düzeni array('d')/
+# array('q') ile denemek, her okumada float kutulandığı için IndexedHeap'ten
+# yavaş çıktı; bu yüzden orada IndexedHeap kullanılmaya devam ediyor.
+
+def _heap_push(keys, nodes, pos, size, node, key):
+    i = pos[node]
+    if i < 0:
+        i = size
+        size += 1
+    elif key >= keys[i]:
+        return size
+    while i > 0:
+        parent = (i - 1) >> 1
+        if key >= keys[parent]:
+            break
+        keys[i] = keys[parent]
+        nodes[i] = nodes[parent]
+        pos[nodes[i]] = i
+        i = parent
+    keys[i] = key
+    nodes[i] = node
+    pos[node] = i
+    return size
+
+def _heap_pop(keys, nodes, pos, size):
+    key = keys[0]
+    node = nodes[0]
+    pos[node] = -1
+    size -= 1
+    if size > 0:
+        last_key = keys[size]
+        last_node = nodes[size]
+        i = 0
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+            if child + 1 < size and keys[child + 1] < keys[child]:
+                child += 1
+            if last_key <= keys[child]:
+                break
+            keys[i] = keys[child]
+            nodes[i] = nodes[child]
+            pos[nodes[i]] = i
+            i = child
+        keys[i] = last_key
+        nodes[i] = last_node
+        pos[last_node] = i
+    return key, node, size
+
+def _dijkstra_csr(
+    indptr, indices, weights, start_i, end_i,
+    dist, parents, gen_dist, gen_settled, keys, nodes, pos, gen,
+):
+    # dist/parents yalnızca gen_dist == gen olan hücrelerde geçerlidir (_SearchBuffers)
+    dist[start_i] = 0.0
+    parents[start_i] = -1
+    gen_dist[start_i] = gen
+    size = _heap_push(keys, nodes, pos, 0, start_i, 0.0)
+    visited_count = 0
+    success = False
+
+    while size > 0:
+        current_dist, current, size = _heap_pop(keys, nodes, pos, size)
+        gen_settled[current] = gen
+        visited_count += 1
+        if current == end_i:
+            success = True
+            break
+        for k in range(indptr[current], indptr[current + 1]):
+            weight = weights[k]
+            if weight == np.inf:
+                continue
+            neighbor = indices[k]
+            new_dist = current_dist + weight
+            if gen_dist[neighbor] != gen or new_dist < dist[neighbor]:
+                dist[neighbor] = new_dist
+                parents[neighbor] = current
+                gen_dist[neighbor] = gen
+                size = _heap_push(keys, nodes, pos, size, neighbor, new_dist)
+
+    # Yığında kalanların konumlarını bir sonraki arama için sıfırla
+    for i in range(size):
+        pos[nodes[i]] = -1
+    return visited_count, success
+
+def _astar_csr(
+    indptr, indices, weights, node_x, node_y, start_i, end_i,
+    g_score, parents, gen_dist, gen_settled, keys, nodes, pos, gen,
+):
+    end_x = node_x[end_i]
+    end_y = node_y[end_i]
+    best_to_end = np.inf
+
+    g_score[start_i] = 0.0
+    parents[start_i] = -1
+    gen_dist[start_i] = gen
+    size = _heap_push(keys, nodes, pos, 0, start_i, 0.0)
+    visited_count = 0
+    success = False
+
+    while size > 0:
+        _, current, size = _heap_pop(keys, nodes, pos, size)
+        gen_settled[current] = gen
+        visited_count += 1
+        if current == end_i:
+            success = True
+            break
+        current_g = g_score[current]
+        for k in range(indptr[current], indptr[current + 1]):
+            neighbor = indices[k]
+            if gen_settled[neighbor] == gen:
+                continue
+            weight = weights[k]
+            if weight == np.inf:
+                continue
+            tentative_g = current_g + weight
+            if gen_dist[neighbor] != gen or tentative_g < g_score[neighbor]:
+                dx = node_x[neighbor] - end_x
+                dy = node_y[neighbor] - end_y
+                f_score = tentative_g + math.sqrt(dx * dx + dy * dy) * 111000
+                if f_score >= best_to_end:
+                    continue
+                g_score[neighbor] = tentative_g
+                parents[neighbor] = current
+                gen_dist[neighbor] = gen
+                if neighbor == end_i:
+                    best_to_end = tentative_g
+                size = _heap_push(keys, nodes, pos, size, neighbor, f_score)
+
+    for i in range(size):
+        pos[nodes[i]] = -1
+    return visited_count, success
+
+def _bidir_batch(
+    indptr, indices, weights, redge, reverse,
+    keys, nodes, pos, state, dist, parents, settled, other_dist, best, max_pops,
+):
+    # Bir yönün yığınından en fazla max_pops düğüm genişletir ve yeni tepe anahtarını döner.
+    # state = [yığın boyu, ziyaret sayısı]; best = [mu, buluşma düğümü] (bu yönün gördüğü).
+    # other_dist karşı yönün (başka iş parçacığında güncellenen) dizisidir; yalnızca okunur.
+    # Bayat okunan değer de gerçek bir yolun uzunluğudur; kesin mu sürücüde hesaplanır.
+    size = state[0]
+    pops = 0
+    while size > 0 and pops < max_pops and keys[0] < best[0]:
+        current_dist, current, size = _heap_pop(keys, nodes, pos, size)
+        settled[current] = 1
+        state[1] += 1
+        pops += 1
+        for k in range(indptr[current], indptr[current + 1]):
+            weight = weights[redge[k]] if reverse else weights[k]
+            if weight == np.inf:
+                continue
+            neighbor = indices[k]
+            new_dist = current_dist + weight
+            if new_dist < dist[neighbor]:
+                dist[neighbor] = new_dist
+                parents[neighbor] = current
+                size = _heap_push(keys, nodes, pos, size, neighbor, new_dist)
+            candidate = dist[neighbor] + other_dist[neighbor]
+            if candidate < best[0]:
+                best[0] = candidate
+                best[1] = neighbor
+    state[0] = size
+    return keys[0] if size > 0 else np.inf
+
+def _parent_chain(parents, end_i):
+    # Ebeveyn zincirini başlangıçtan end_i'ye sıralı döner: önce uzunluk sayılır,
+    # sonra önceden ayrılmış dizi sondan başa doldurulur (append + reverse yok).
+    n = 0
+    cur = end_i
+    while cur >= 0:
+        n += 1
+        cur = parents[cur]
+    out = np.empty(n, dtype=np.int64)
+    cur = end_i
+    for i in range(n - 1, -1, -1):
+        out[i] = cur
+        cur = parents[cur]
+    return out
+
+if njit is not None:
+    _heap_push = njit(cache=True)(_heap_push)
+    _heap_pop = njit(cache=True)(_heap_pop)
+    # nogil: aramalar (ve çift yönlü aramanın iki yönü) ayrı iş parçacıklarında
+    # gerçekten eşzamanlı çalışabilsin; her arama kendi tamponunu kullanır.
+    _dijkstra_csr = njit(cache=True, nogil=True)(_dijkstra_csr)
+    _astar_csr = njit(cache=True, nogil=True)(_astar_csr)
+    _bidir_batch = njit(cache=True, nogil=True)(_bidir_batch)
+    _parent_chain = njit(cache=True)(_parent_chain)
+
+def _csr_result(
+    index: GraphIndex,
+    end_i: int,
+    parents: Any,
+    dist: Any,
+    settled: Any,
+    visited_count: int,
+    success: bool,
+) -> tuple[List[Any], int, float, bool]:
+    """Çekirdek çıktısını (dizi tabanlı) düğüm kimlikli sonuca çevirir."""
+    if visited_count == 0:
+        return [], 0, float('inf'), False
+
+    if success:
+        target = end_i
+    else:
+        # Hedefe varamadıysak en yakın noktaya (Fallback)
+        target = _nearest_settled(index, settled, end_i)
+
+    node_ids = index.node_ids
+    path = [node_ids[i] for i in _parent_chain(parents, target).tolist()]
+    return path, int(visited_count), float(dist[target]), bool(success)
+
 def dijkstra_search(
     G: Any, start: Any, end: Any, ignore_damage: bool = False
 ) -> tuple[List[Any], int, float, bool]:
     
-    queue: List[Tuple[float, Any]] = [(0.0, start)]
-    distances: Dict[Any, float] = {start: 0.0}
-    parents: Dict[Any, Any] = {start: None}
-    visited = set()
+    index = GraphIndex.of(G)
+    s = index.id_to_idx[start]
+    t = index.id_to_idx[end]
+
+    if njit is not None:
+        buf = index.acquire_buffers()
+        try:
+            visited_count, success = _dijkstra_csr(
+                index.indptr, index.indices, index.search_weights(ignore_damage), s, t,
+                buf.dist, buf.parents, buf.gen_dist, buf.gen_settled,
+                buf.keys, buf.nodes, buf.pos, buf.next_gen(),
+            )
+            return _csr_result(
+                index, t, buf.parents, buf.dist, buf.settled_mask(), visited_count, success
+            )
+        finally:
+            index.release_buffers(buf)
+
+    lists = index.as_lists()
+    indptr, indices = lists["indptr"], lists["indices"]
+    weights = lists["weights"] if ignore_damage else lists["open_weights"]
+
+    queue = IndexedHeap()
+    queue.push_or_decrease(s, 0.0)
+    distances: Dict[int, float] = {s: 0.0}
+    parents: Dict[int, Any] = {s: None}
+    # Kesinleşen düğümler için küme yerine düğüm başına bir bayt
+    visited = bytearray(len(index.node_ids))
     visited_count = 0
     success = False
 
     while queue:
-        current_dist, current = heapq.heappop(queue)
-
-        if current in visited:
-            continue
-        visited.add(current)
+        current_dist, current = queue.pop_min()
+        visited[current] = 1
         visited_count += 1
 
-        if current == end:
+        if current == t:
             success = True
             break
 
-        for neighbor in G.neighbors(current):
-            # DÜZELTME: Ağırlık ve Engel kontrolünü tek fonksiyonda yap
-            weight = get_best_edge_weight(G, current, neighbor, ignore_damage)
+        for k in range(indptr[current], indptr[current + 1]):
+            weight = weights[k]
             
             # Eğer yol kapalıysa (sonsuz ağırlık), atla
             if weight == float('inf'):
                 continue
 
+            neighbor = indices[k]
             new_dist = current_dist + weight
             
             if new_dist < distances.get(neighbor, float('inf')):
                 distances[neighbor] = new_dist
                 parents[neighbor] = current
-                heapq.heappush(queue, (new_dist, neighbor))
+                queue.push_or_decrease(neighbor, new_dist)
 
-    if not visited:
+    if not visited_count:
         return [], visited_count, float('inf'), False
 
     # Hedefe varamadıysak en yakın noktaya (Fallback)
-    target_node = end if success else min(visited, key=lambda n: heuristic(G, n, end))
+    target_node = t if success else _nearest_settled(index, visited, t)
     total_dist = distances.get(target_node, float('inf'))
-    path = _reconstruct_path(parents, target_node)
+    path = [index.node_ids[i] for i in _reconstruct_path(parents, target_node)]
     
     return path, visited_count, total_dist, success
 
@@ -115,45 +701,299 @@ def astar_search(
     G: Any, start: Any, end: Any, ignore_damage: bool = False
 ) -> tuple[List[Any], int, float, bool]:
     
-    queue: List[Tuple[float, Any]] = [(0.0, start)]
-    g_score: Dict[Any, float] = {start: 0.0}
-    parents: Dict[Any, Any] = {start: None}
-    visited = set()
+    index = GraphIndex.of(G)
+    s = index.id_to_idx[start]
+    t = index.id_to_idx[end]
+
+    if njit is not None:
+        buf = index.acquire_buffers()
+        try:
+            visited_count, success = _astar_csr(
+                index.indptr,
+                index.indices,
+                index.search_weights(ignore_damage),
+                index.node_x,
+                index.node_y,
+                s,
+                t,
+                buf.dist, buf.parents, buf.gen_dist, buf.gen_settled,
+                buf.keys, buf.nodes, buf.pos, buf.next_gen(),
+            )
+            return _csr_result(
+                index, t, buf.parents, buf.dist, buf.settled_mask(), visited_count, success
+            )
+        finally:
+            index.release_buffers(buf)
+
+    lists = index.as_lists()
+    indptr, indices, xs, ys = lists["indptr"], lists["indices"], lists["node_x"], lists["node_y"]
+    weights = lists["weights"] if ignore_damage else lists["open_weights"]
+    end_x, end_y = xs[t], ys[t]
+    h_memo = index.heuristic_memo(t)
+    # Hedefe şimdiye kadar bulunan en iyi g; f'si bunu aşan düğümler kuyruğa girmez
+    best_to_end = float('inf')
+
+    queue = IndexedHeap()
+    queue.push_or_decrease(s, 0.0)
+    g_score: Dict[int, float] = {s: 0.0}
+    parents: Dict[int, Any] = {s: None}
+    # Kesinleşen düğümler için küme yerine düğüm başına bir bayt
+    visited = bytearray(len(index.node_ids))
     visited_count = 0
     success = False
 
     while queue:
-        _, current = heapq.heappop(queue)
-
-        if current in visited:
-            continue
-        visited.add(current)
+        _, current = queue.pop_min()
+        visited[current] = 1
         visited_count += 1
 
-        if current == end:
+        if current == t:
             success = True
             break
 
-        for neighbor in G.neighbors(current):
-            # DÜZELTME: Ağırlık ve Engel kontrolünü tek fonksiyonda yap
-            weight = get_best_edge_weight(G, current, neighbor, ignore_damage)
+        current_g = g_score[current]
+        for k in range(indptr[current], indptr[current + 1]):
+            neighbor = indices[k]
+            # Kapalı düğümler yeniden açılmaz (her düğüm bir kez genişletilir)
+            if visited[neighbor]:
+                continue
+            weight = weights[k]
             
             if weight == float('inf'):
                 continue
 
-            tentative_g = g_score.get(current, float('inf')) + weight
+            tentative_g = current_g + weight
             
             if tentative_g < g_score.get(neighbor, float('inf')):
+                # heuristic() ile aynı: derece cinsinden Öklid x 111000
+                h = h_memo.get(neighbor)
+                if h is None:
+                    h = h_memo[neighbor] = (
+                        math.hypot(xs[neighbor] - end_x, ys[neighbor] - end_y) * 111000
+                    )
+                f_score = tentative_g + h
+                if f_score >= best_to_end:
+                    continue
                 g_score[neighbor] = tentative_g
                 parents[neighbor] = current
-                f_score = tentative_g + heuristic(G, neighbor, end)
-                heapq.heappush(queue, (f_score, neighbor))
+                if neighbor == t:
+                    best_to_end = tentative_g
+                queue.push_or_decrease(neighbor, f_score)
 
-    if not visited:
+    if not visited_count:
         return [], visited_count, float('inf'), False
 
-    target_node = end if success else min(visited, key=lambda n: heuristic(G, n, end))
+    target_node = t if success else _nearest_settled(index, visited, t)
     total_dist = g_score.get(target_node, float('inf'))
-    path = _reconstruct_path(parents, target_node)
+    path = [index.node_ids[i] for i in _reconstruct_path(parents, target_node)]
     
-    return path, visited_count, total_dist, success
\ No newline at end of file
+    return path, visited_count, total_dist, success
+
+def prepare_searches(G: Any) -> None:
+    """
+    İndeksi kurar ve (numba varsa) Dijkstra/A* çekirdeklerini derletir ya da
+    önbellekten yükler. Süre ölçümünden önce çağrılır; böylece bu tek seferlik
+    maliyetler ilk ölçülen aramaya yazılmaz.
+    """
+    index = GraphIndex.of(G)
+    if index.node_ids:
+        # Başlangıç = hedef: çekirdek gerçek dizi tipleriyle bir kez çalışır
+        node = index.node_ids[0]
+        dijkstra_search(G, node, node)
+        astar_search(G, node, node)
+
+# Çift yönlü aramada her yön bir turda en fazla bu kadar düğüm genişletir;
+# sonlanma kontrolü ve iş parçacığı eşitlemesi tur başına bir kez yapılır.
+_BIDIR_BATCH = 256
+# Bu düğüm sayısının altında (ya da tek çekirdekte) iş parçacığı eşitlemesi
+# kazançtan pahalıya gelir.
+_BIDIR_THREAD_MIN_NODES = 50000
+_BIDIR_POOL = None
+
+def _bidir_pool() -> ThreadPoolExecutor:
+    global _BIDIR_POOL
+    if _BIDIR_POOL is None:
+        _BIDIR_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bidir")
+    return _BIDIR_POOL
+
+def _bidir_side(n: int, root: int) -> tuple:
+    # Tek yönün durumu: yığın (keys/nodes/pos), state, dist, parents, settled, best
+    keys = np.empty(n, dtype=np.float64)
+    nodes = np.empty(n, dtype=np.int64)
+    pos = np.full(n, -1, dtype=np.int64)
+    keys[0] = 0.0
+    nodes[0] = root
+    pos[root] = 0
+    dist = np.full(n, np.inf)
+    dist[root] = 0.0
+    parents = np.full(n, -1, dtype=np.int64)
+    settled = np.zeros(n, dtype=np.uint8)
+    state = np.array([1, 0], dtype=np.int64)
+    best = np.array([np.inf, -1.0])
+    return keys, nodes, pos, state, dist, parents, settled, best
+
+def _bidirectional_csr(
+    index: GraphIndex, weights: np.ndarray, s: int, t: int, threaded: bool
+) -> tuple[List[Any], int, float, bool]:
+    n = len(index.node_ids)
+    fk, fn, fp, fstate, df, pf, sf, fbest = _bidir_side(n, s)
+    bk, bn, bp, bstate, db, pb, sb, bbest = _bidir_side(n, t)
+    forward = (
+        index.indptr, index.indices, weights, index.redge, False,
+        fk, fn, fp, fstate, df, pf, sf, db, fbest, _BIDIR_BATCH,
+    )
+    backward = (
+        index.rindptr, index.rindices, weights, index.redge, True,
+        bk, bn, bp, bstate, db, pb, sb, df, bbest, _BIDIR_BATCH,
+    )
+
+    mu = float('inf')
+    top_f = top_b = 0.0
+    while top_f + top_b < mu:
+        fbest[0] = bbest[0] = mu
+        if threaded:
+            # Geri yön havuzda, ileri yön bu iş parçacığında (ikisi de GIL'i bırakır)
+            pending = _bidir_pool().submit(_bidir_batch, *backward)
+            top_f = _bidir_batch(*forward)
+            top_b = pending.result()
+        else:
+            top_f = _bidir_batch(*forward)
+            top_b = _bidir_batch(*backward)
+        mu = min(mu, fbest[0], bbest[0])
+
+    visited_count = int(fstate[1] + bstate[1])
+    # Turlar sırasında karşı yön eşzamanlı okunduğundan kesin buluşma noktası
+    # iki etiketin toplamının en küçüğü olarak burada yeniden bulunur.
+    total = df + db
+    meet = int(np.argmin(total))
+    if total[meet] == np.inf:
+        return _csr_result(index, t, pf, df, sf, visited_count, False)
+
+    # İleri zincir (start -> meet) + geri zincirin tersi (meet -> end)
+    path_idx = _parent_chain(pf, meet).tolist()
+    path_idx.extend(_parent_chain(pb, meet)[-2::-1].tolist())
+
+    path = [index.node_ids[i] for i in path_idx]
+    return path, visited_count, float(total[meet]), True
+
+def bidirectional_dijkstra(
+    G: Any, start: Any, end: Any, ignore_damage: bool = False
+) -> tuple[List[Any], int, float, bool]:
+    """
+    Çift yönlü Dijkstra: başlangıçtan ileri, hedeften geri aynı anda arar.
+    Her adımda tepe anahtarı küçük olan kuyruk genişletilir; iki kuyruğun
+    tepe toplamı en iyi buluşma maliyetini (mu) geçtiğinde yol kesinleşir.
+    Geri arama ters CSR (rindptr/rindices) üzerinden gelen kenarları gezer.
+    """
+    if start == end:
+        return [start], 1, 0.0, True
+
+    index = GraphIndex.of(G)
+    s = index.id_to_idx[start]
+    t = index.id_to_idx[end]
+
+    if njit is not None:
+        threaded = len(index.node_ids) >= _BIDIR_THREAD_MIN_NODES and (os.cpu_count() or 1) > 1
+        return _bidirectional_csr(index, index.search_weights(ignore_damage), s, t, threaded)
+
+    lists = index.as_lists()
+    indptr, indices = lists["indptr"], lists["indices"]
+    rindptr, rindices, redge = lists["rindptr"], lists["rindices"], lists["redge"]
+    weights = lists["weights"] if ignore_damage else lists["open_weights"]
+
+    qf = IndexedHeap()
+    qb = IndexedHeap()
+    qf.push_or_decrease(s, 0.0)
+    qb.push_or_decrease(t, 0.0)
+    df: Dict[int, float] = {s: 0.0}
+    db: Dict[int, float] = {t: 0.0}
+    parents_f: Dict[int, Any] = {s: None}
+    parents_b: Dict[int, Any] = {t: None}
+    settled_f = bytearray(len(index.node_ids))
+    settled_b = bytearray(len(index.node_ids))
+    mu = float('inf')
+    meet = None
+    visited_count = 0
+
+    while qf and qb:
+        top_f = qf.peek_key()
+        top_b = qb.peek_key()
+        if top_f + top_b >= mu:
+            break
+
+        # Tepe anahtarı küçük olan yönü genişlet (min-key stratejisi)
+        forward = top_f <= top_b
+        if forward:
+            queue, dist, parents, settled, other_dist = qf, df, parents_f, settled_f, db
+            ptr, nbrs = indptr, indices
+        else:
+            queue, dist, parents, settled, other_dist = qb, db, parents_b, settled_b, df
+            ptr, nbrs = rindptr, rindices
+
+        current_dist, current = queue.pop_min()
+        settled[current] = 1
+        visited_count += 1
+
+        for k in range(ptr[current], ptr[current + 1]):
+            weight = weights[k] if forward else weights[redge[k]]
+            if weight == float('inf'):
+                continue
+
+            neighbor = nbrs[k]
+            new_dist = current_dist + weight
+            if new_dist < dist.get(neighbor, float('inf')):
+                dist[neighbor] = new_dist
+                parents[neighbor] = current
+                queue.push_or_decrease(neighbor, new_dist)
+
+            # Karşı yön bu düğüme ulaştıysa buluşma maliyetini güncelle
+            if neighbor in other_dist:
+                candidate = dist[neighbor] + other_dist[neighbor]
+                if candidate < mu:
+                    mu = candidate
+                    meet = neighbor
+
+    if meet is None:
+        if not any(settled_f):
+            return [], visited_count, float('inf'), False
+        # Hedefe varamadıysak ileri aramada en yakın noktaya (Fallback)
+        target_node = _nearest_settled(index, settled_f, t)
+        path = [index.node_ids[i] for i in _reconstruct_path(parents_f, target_node)]
+        return path, visited_count, df[target_node], False
+
+    # İleri zincir (start -> meet) + geri zincirin tersi (meet -> end)
+    path_idx = _reconstruct_path(parents_f, meet)
+    cur = parents_b.get(meet)
+    while cur is not None:
+        path_idx.append(cur)
+        cur = parents_b.get(cur)
+
+    path = [index.node_ids[i] for i in path_idx]
+    return path, visited_count, df[meet] + db[meet], True
+
+_SEARCHES = {
+    "dijkstra": dijkstra_search,
+    "astar": astar_search,
+    "bidirectional": bidirectional_dijkstra,
+}
+_GRAPHS: "weakref.WeakValueDictionary[int, Any]" = weakref.WeakValueDictionary()
+
+@lru_cache(maxsize=256)
+def _search_cached(
+    graph_id: int, version: int, start: Any, end: Any, mode: str, ignore_damage: bool
+) -> tuple[Tuple[Any, ...], int, float, bool]:
+    path, visited_count, total_dist, success = _SEARCHES[mode](
+        _GRAPHS[graph_id], start, end, ignore_damage=ignore_damage
+    )
+    return tuple(path), visited_count, total_dist, success
+
+def cached_search(
+    G: Any, start: Any, end: Any, mode: str = "dijkstra", ignore_damage: bool = False
+) -> tuple[Tuple[Any, ...], int, float, bool]:
+    """
+    Aynı (başlangıç, bitiş, mod, ignore_damage) sorgusunu grafiğin sürümü
+    değişmediği sürece yeniden çalıştırmaz. Yol paylaşıldığı için tuple döner.
+    mode: "dijkstra", "astar" veya "bidirectional".
+    """
+    _GRAPHS[id(G)] = G
+    return _search_cached(id(G), graph_version(G), start, end, mode, ignore_damage)
@@ -3,7 +3,42 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Tuple
+from functools import lru_cache
+from typing import Any, Iterable, Optional, Tuple
+
+import numpy as np
+
+# Below this many points NumPy is fast enough; only large projections go
+# through the jitted kernel and pay for its compile (or cache load).
+_PROJECT_JIT_MIN = 100_000
+
+
+def _project(
+    lats: Any, lons: Any, min_lon: float, max_lat: float, scale: float, padding: float
+) -> Any:
+    """Fused geo_to_screen over arrays: one pass, no float temporaries."""
+    n = lats.shape[0]
+    out = np.empty((2, n), dtype=np.int32)
+    for i in range(n):
+        out[0, i] = np.int32((lons[i] - min_lon) * scale + padding)
+        out[1, i] = np.int32((max_lat - lats[i]) * scale + padding)
+    return out
+
+
+@lru_cache(maxsize=None)
+def _project_kernel() -> Any:
+    """``_project`` compiled with numba on first use, or None without numba."""
+    try:
+        from numba import njit
+    except ImportError:  # pragma: no cover - optional dependency
+        return None
+    # No fast-math: pixel truncation must match the scalar geo_to_screen exactly.
+    kernel = njit(cache=True, nogil=True)(_project)
+    try:
+        kernel(np.zeros(1), np.zeros(1), 0.0, 0.0, 1.0, 0.0)
+    except Exception:  # pragma: no cover - broken numba install
+        return None
+    return kernel
 
 
 @dataclass
@@ -26,13 +61,18 @@ class CoordinateTransformer:
         self.height = screen_height
         self.padding = padding
 
-        lons = [data["x"] for _, data in graph.nodes(data=True)]
-        lats = [data["y"] for _, data in graph.nodes(data=True)]
+        # Single pass over the node data; kept as arrays for batch transforms.
+        node_items = list(graph.nodes(data=True))
+        node_data = [data for _, data in node_items]
+        self._node_row = {node: i for i, (node, _) in enumerate(node_items)}
+        self._node_screen: Optional[np.ndarray] = None
+        self._xs = np.fromiter((d["x"] for d in node_data), dtype=np.float64, count=len(node_data))
+        self._ys = np.fromiter((d["y"] for d in node_data), dtype=np.float64, count=len(node_data))
 
-        self.min_lon = min(lons)
-        self.max_lon = max(lons)
-        self.min_lat = min(lats)
-        self.max_lat = max(lats)
+        self.min_lon = float(self._xs.min())
+        self.max_lon = float(self._xs.max())
+        self.min_lat = float(self._ys.min())
+        self.max_lat = float(self._ys.max())
 
         lon_range = self.max_lon - self.min_lon
         lat_range = self.max_lat - self.min_lat
@@ -45,12 +85,47 @@ class CoordinateTransformer:
         else:
             self.scale = min(usable_width / lon_range, usable_height / lat_range)
 
+        # screen_to_geo as one multiply-add per axis (clicks hit it every time).
+        self._inv_scale = 1.0 / self.scale
+        self._lon_origin = self.min_lon - self.padding * self._inv_scale
+        self._lat_origin = self.max_lat + self.padding * self._inv_scale
+
     def geo_to_screen(self, lat: float, lon: float) -> Tuple[int, int]:
         x = (lon - self.min_lon) * self.scale + self.padding
         y = (self.max_lat - lat) * self.scale + self.padding
         return int(x), int(y)
 
+    def geo_to_screen_vec(self, lats: Any, lons: Any) -> np.ndarray:
+        """Vectorized geo_to_screen; returns a (2, N) int32 array of x and y rows."""
+        lats = np.ascontiguousarray(lats, dtype=np.float64).reshape(-1)
+        lons = np.ascontiguousarray(lons, dtype=np.float64).reshape(-1)
+        kernel = _project_kernel() if lats.shape[0] >= _PROJECT_JIT_MIN else None
+        if kernel is not None:
+            return kernel(
+                lats, lons, self.min_lon, self.max_lat, float(self.scale), float(self.padding)
+            )
+        x = (lons - self.min_lon) * self.scale + self.padding
+        y = (self.max_lat - lats) * self.scale + self.padding
+        return np.stack([x, y]).astype(np.int32)
+
+    def node_screen(self, nodes: Iterable[Any]) -> np.ndarray:
+        """Screen positions of graph nodes as a (2, k) int32 array.
+
+        All nodes are projected once into a table; later calls only gather rows.
+        """
+        if self._node_screen is None:
+            self._node_screen = self.geo_to_screen_vec(self._ys, self._xs)
+        rows = np.fromiter((self._node_row[node] for node in nodes), dtype=np.intp)
+        return self._node_screen[:, rows]
+
+    def screen_to_geo_bbox(
+        self, x0: float, y0: float, x1: float, y1: float
+    ) -> Tuple[float, float, float, float]:
+        """Geographic (min_lon, min_lat, max_lon, max_lat) of a screen rectangle."""
+        lat_a, lon_a = self.screen_to_geo(x0, y0)
+        lat_b, lon_b = self.screen_to_geo(x1, y1)
+        return min(lon_a, lon_b), min(lat_a, lat_b), max(lon_a, lon_b), max(lat_a, lat_b)
+
     def screen_to_geo(self, x: float, y: float) -> Tuple[float, float]:
-        lon = (x - self.padding) / self.scale + self.min_lon
-        lat = self.max_lat - (y - self.padding) / self.scale
-        return lat, lon
+        inv = self._inv_scale
+        return self._lat_origin - y * inv, self._lon_origin + x * inv
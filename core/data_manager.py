@@ -2,16 +2,52 @@
 
 from __future__ import annotations
 
-from typing import Any, Tuple, List
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Tuple
 
 from math import radians, sin, cos, asin, sqrt
 import random
+from weakref import WeakKeyDictionary
+
+import numpy as np
+
+from core.algorithms import invalidate_index, set_blocked, set_blocked_pairs
 
 try:
     import osmnx as ox
 except ImportError:  # pragma: no cover - optional dependency
     ox = None  # type: ignore
 
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # pragma: no cover - optional dependency
+    cKDTree = None  # type: ignore
+
+try:
+    from numba import njit, prange
+except ImportError:  # pragma: no cover - optional dependency
+    njit = None  # type: ignore
+    prange = range  # type: ignore
+
+# Per-graph node coordinate arrays: (node_ids, lats, lons).
+_NODE_ARRAY_CACHE: "WeakKeyDictionary[Any, Tuple[List[Any], Any, Any]]" = WeakKeyDictionary()
+# Per-graph KD-tree over equirectangular node coordinates: (tree, node_ids, lat0).
+_KDTREE_CACHE: "WeakKeyDictionary[Any, Tuple[Any, List[Any], float]]" = WeakKeyDictionary()
+# Per-graph node trig terms for the haversine scan: (lat_rad, lon_rad, cos_lat).
+_NODE_TRIG_CACHE: "WeakKeyDictionary[Any, Tuple[Any, Any, Any]]" = WeakKeyDictionary()
+# Per-graph Morton (z-order) node index, used when scipy is missing.
+_MORTON_CACHE: "WeakKeyDictionary[Any, Tuple[Any, ...]]" = WeakKeyDictionary()
+# Per-graph edge arrays: (edge_uvk, mid_lats, mid_lons, geoms, has_geom).
+_EDGE_ARRAY_CACHE: "WeakKeyDictionary[Any, Tuple[List[Any], Any, Any, Any, Any]]" = (
+    WeakKeyDictionary()
+)
+# Per-graph STRtree over edge geometries: (tree, edge keys, geometries).
+_EDGE_TREE_CACHE: "WeakKeyDictionary[Any, Tuple[Any, List[Any], List[Any]]]" = WeakKeyDictionary()
+# Per-graph KD-tree over equirectangular edge midpoints: (tree, edge rows, lat0).
+_EDGE_KDTREE_CACHE: "WeakKeyDictionary[Any, Tuple[Any, Any, float]]" = WeakKeyDictionary()
+# Meters per degree of latitude (R * pi / 180, the haversine radius).
+_M_PER_DEG = 111194.9
+
 
 def load_graph(place_name: str) -> Any:
     """Fetch raw (unprojected) graph data for a place using OSMnx with speeds and travel times."""
@@ -92,105 +128,283 @@ def get_nearest_edge_point(graph: Any, lat: float, lon: float):
     Returns (projected_lat, projected_lon, target_node_id) or raises on failure.
     """
 
-    if ox is None:
-        raise ImportError("osmnx is required for get_nearest_edge_point")
-
     try:
-        # nearest_edges expects (X=lon, Y=lat)
-        u, v, key = ox.nearest_edges(graph, lon, lat)
+        from shapely.geometry import Point
+        from shapely.ops import nearest_points
     except Exception as exc:
-        raise ValueError(f"En yakın yol bulunamadı: {exc}") from exc
+        raise ImportError("shapely is required for get_nearest_edge_point") from exc
 
-    edge_data = graph.get_edge_data(u, v, key)
-    if edge_data is None:
-        raise ValueError("Edge verisi bulunamadı")
+    click_point = Point(lon, lat)
+    edge_tree = _edge_strtree(graph)
+    hit = edge_tree[0].nearest(click_point) if edge_tree is not None else None
+    if isinstance(hit, (int, np.integer)):
+        u, v, key = edge_tree[1][hit]
+        geom = edge_tree[2][hit]
+    else:
+        # Older shapely returns geometries from nearest(); use OSMnx instead.
+        if ox is None:
+            raise ImportError("osmnx is required for get_nearest_edge_point")
+        try:
+            # nearest_edges expects (X=lon, Y=lat)
+            u, v, key = ox.nearest_edges(graph, lon, lat)
+        except Exception as exc:
+            raise ValueError(f"En yakın yol bulunamadı: {exc}") from exc
 
-    geom = edge_data.get("geometry")
-    if geom is None:
-        from shapely.geometry import LineString
+        edge_data = graph.get_edge_data(u, v, key)
+        if edge_data is None:
+            raise ValueError("Edge verisi bulunamadı")
 
         try:
-            geom = LineString(
-                [
-                    (graph.nodes[u]["x"], graph.nodes[u]["y"]),
-                    (graph.nodes[v]["x"], graph.nodes[v]["y"]),
-                ]
-            )
+            geom = _edge_geometry(graph, u, v, edge_data)
         except Exception as exc:
             raise ValueError(f"Edge geometrisi oluşturulamadı: {exc}") from exc
 
-    try:
-        from shapely.geometry import Point
-        from shapely.ops import nearest_points
-    except Exception as exc:
-        raise ImportError("shapely is required for get_nearest_edge_point") from exc
-
-    click_point = Point(lon, lat)
     nearest_on_edge = nearest_points(click_point, geom)[1]
     proj_lon, proj_lat = nearest_on_edge.x, nearest_on_edge.y
 
-    # Pick closer endpoint of the edge.
-    du = _haversine(proj_lat, proj_lon, graph.nodes[u]["y"], graph.nodes[u]["x"])
-    dv = _haversine(proj_lat, proj_lon, graph.nodes[v]["y"], graph.nodes[v]["x"])
-    target_node = u if du <= dv else v
+    # Pick the closer endpoint by position along the edge (geometry runs u -> v).
+    target_node = u if geom.project(click_point) <= geom.length / 2 else v
 
     return proj_lat, proj_lon, target_node
 
 
-def block_area(graph: Any, lat: float, lon: float, radius_m: float = 50.0):
-    """Mark edges within radius as blocked; return list of blocked (u, v, key)."""
+def _edge_geometry(graph: Any, u: Any, v: Any, data: dict) -> Any:
+    """Edge geometry, or a straight segment between its endpoints when missing."""
+
+    geom = data.get("geometry")
+    if geom is None:
+        from shapely.geometry import LineString
+
+        geom = LineString(
+            [
+                (graph.nodes[u]["x"], graph.nodes[u]["y"]),
+                (graph.nodes[v]["x"], graph.nodes[v]["y"]),
+            ]
+        )
+    return geom
+
+
+def _edge_strtree(graph: Any) -> Any:
+    """Return cached (tree, edge_keys, geoms) for nearest-edge queries, or None."""
+
+    cached = _EDGE_TREE_CACHE.get(graph)
+    if cached is None:
+        try:
+            from shapely.strtree import STRtree
+        except ImportError:
+            return None
+        edge_keys = []
+        geoms = []
+        for u, v, key, data in graph.edges(keys=True, data=True):
+            edge_keys.append((u, v, key))
+            geoms.append(_edge_geometry(graph, u, v, data))
+        cached = (STRtree(geoms), edge_keys, geoms)
+        _EDGE_TREE_CACHE[graph] = cached
+    return cached
+
+
+def _edge_arrays(graph: Any) -> Tuple[List[Any], Any, Any, Any, Any]:
+    """Return cached (edge_uvk, mid_lats, mid_lons, geoms, has_geom) for all edges.
+
+    Midpoints are float32 (well under a metre of rounding, half the bytes for
+    the damage scan) and NaN when an endpoint lacks coordinates; ``geoms`` is an
+    object array holding the edge's own geometry or None, and ``has_geom``
+    flags the ones that have one.
+    """
+
+    cached = _EDGE_ARRAY_CACHE.get(graph)
+    if cached is not None:
+        return cached
+
+    nodes = graph.nodes
+    edge_uvk: List[Any] = []
+    mid_lats: List[float] = []
+    mid_lons: List[float] = []
+    geoms: List[Any] = []
+    for u, v, key, data in graph.edges(keys=True, data=True):
+        n1 = nodes[u]
+        n2 = nodes[v]
+        try:
+            mid_lat = (n1.get("y") + n2.get("y")) / 2
+            mid_lon = (n1.get("x") + n2.get("x")) / 2
+        except TypeError:
+            mid_lat = mid_lon = float("nan")
+        edge_uvk.append((u, v, key))
+        mid_lats.append(mid_lat)
+        mid_lons.append(mid_lon)
+        geoms.append(data.get("geometry"))
+
+    has_geom = np.fromiter((geom is not None for geom in geoms), dtype=bool, count=len(geoms))
+    geom_arr = np.empty(len(geoms), dtype=object)
+    geom_arr[:] = geoms
+    cached = (
+        edge_uvk,
+        np.asarray(mid_lats, dtype=np.float32),
+        np.asarray(mid_lons, dtype=np.float32),
+        geom_arr,
+        has_geom,
+    )
+    _EDGE_ARRAY_CACHE[graph] = cached
+    return cached
+
+
+def _edge_candidates(graph: Any, lat: float, lon: float, radius_m: float) -> Any:
+    """Sorted edge indices whose geometry bbox meets the radius bbox, or None.
+
+    Uses the cached edge STRtree (same edge order as ``_edge_arrays``); returns
+    None when shapely is unavailable so callers scan every edge instead.
+    """
 
-    blocked_edges = set()
     try:
-        from shapely.geometry import Point
-        from shapely.ops import nearest_points
+        edge_tree = _edge_strtree(graph)
+        from shapely.geometry import box
+    except Exception:
+        edge_tree = None
+    if edge_tree is None:
+        return _midpoint_candidates(graph, lat, lon, radius_m)
+
+    # Degrees per meter along a meridian; longitude degrees widen with latitude.
+    dlat = radius_m / _M_PER_DEG
+    dlon = dlat / max(cos(radians(lat)), 1e-6)
+    hits = np.asarray(edge_tree[0].query(box(lon - dlon, lat - dlat, lon + dlon, lat + dlat)))
+    if hits.dtype.kind not in "iu":
+        # shapely < 2 returns geometries rather than indices
+        return _midpoint_candidates(graph, lat, lon, radius_m)
+    return np.sort(hits)
+
+
+def _edge_midpoint_kdtree(graph: Any) -> Tuple[Any, Any, float]:
+    """Build (once per graph) a KD-tree on equirectangular edge midpoints (meters)."""
+
+    cached = _EDGE_KDTREE_CACHE.get(graph)
+    if cached is not None:
+        return cached
+
+    _, mid_lats, mid_lons, _, _ = _edge_arrays(graph)
+    # Midpoints of edges without coordinates are NaN and never within range.
+    rows = np.flatnonzero(np.isfinite(mid_lats) & np.isfinite(mid_lons))
+    lat0 = float(mid_lats[rows].mean()) if len(rows) else 0.0
+    tree = None
+    if len(rows):
+        lats = mid_lats[rows].astype(np.float64)
+        lons = mid_lons[rows].astype(np.float64)
+        tree = cKDTree(np.column_stack([lons * cos(radians(lat0)), lats]) * _M_PER_DEG)
+    cached = (tree, rows, lat0)
+    _EDGE_KDTREE_CACHE[graph] = cached
+    return cached
+
+
+def _midpoint_candidates(graph: Any, lat: float, lon: float, radius_m: float) -> Any:
+    """Sorted edge indices whose midpoint is roughly within ``radius_m``, or None.
+
+    Only valid while every edge is measured at its midpoint, i.e. no edge has a
+    geometry; otherwise (or without scipy) returns None.
+    """
+
+    if cKDTree is None or _edge_arrays(graph)[4].any():
+        return None
+    tree, rows, lat0 = _edge_midpoint_kdtree(graph)
+    if tree is None:
+        return np.empty(0, dtype=np.intp)
+    # Generous margin over the equirectangular approximation; the exact
+    # haversine test on the candidates decides.
+    point = np.array([lon * cos(radians(lat0)), lat]) * _M_PER_DEG
+    hits = tree.query_ball_point(point, radius_m * 1.2 + 1.0)
+    return np.sort(rows[np.asarray(hits, dtype=np.intp)])
+
+
+def _edges_within(graph: Any, lat: float, lon: float, radius_m: float) -> List[int]:
+    """Indices into ``_edge_arrays`` of edges within ``radius_m`` of (lat, lon).
+
+    Candidates come from an STRtree bbox query when available. Edges with a
+    geometry are measured to their nearest point; the rest (and any geometry
+    shapely fails on) to the midpoint of their endpoints.
+    """
+
+    edge_uvk, mid_lats, mid_lons, geoms, has_geom = _edge_arrays(graph)
+    candidates = _edge_candidates(graph, lat, lon, radius_m)
+    if candidates is None:
+        candidates = np.arange(len(edge_uvk))
+        lats, lons = mid_lats, mid_lons
+    else:
+        lats, lons = mid_lats[candidates], mid_lons[candidates]
+    scan = _parallel_scan() if len(candidates) >= _PARALLEL_SCAN_MIN else None
+    if scan is not None:
+        dists = scan(lat, lon, lats, lons)
+    else:
+        dists = _haversine_vec(lat, lon, lats, lons)
+    geom_pos = np.flatnonzero(has_geom[candidates])
+    if len(geom_pos):
+        dists[geom_pos] = _geometry_dists(lat, lon, geoms[candidates[geom_pos]], dists[geom_pos])
+    return candidates[dists <= radius_m].tolist()
+
+
+def _geometry_dists(lat: float, lon: float, geoms: Any, fallback: Any) -> Any:
+    """Haversine meters from (lat, lon) to the nearest point of each geometry.
+
+    Vectorized through shapely 2's ``shortest_line``; on older shapely each
+    geometry goes through ``nearest_points``. Entries shapely cannot handle
+    keep their ``fallback`` (midpoint) distance.
+    """
 
-        click_pt = Point(lon, lat)
+    try:
+        import shapely
+
+        starts = shapely.get_point(shapely.shortest_line(geoms, shapely.Point(lon, lat)), 0)
+        return _haversine_vec(lat, lon, shapely.get_y(starts), shapely.get_x(starts))
     except Exception:
-        click_pt = None
-        nearest_points = None  # type: ignore
+        pass
 
-    def mark_block(u, v):
+    dists = fallback.copy()
+    try:
+        from shapely.geometry import Point
+        from shapely.ops import nearest_points
+    except Exception:
+        return dists
+    center_pt = Point(lon, lat)
+    partial = _haversine_partial(lat, lon)
+    for j, geom in enumerate(geoms):
         try:
-            edge_dict = graph.get_edge_data(u, v)
+            nearest_on = nearest_points(center_pt, geom)[1]
+            dists[j] = _haversine_from_partial(partial, nearest_on.y, nearest_on.x)
         except Exception:
-            edge_dict = None
-        if not edge_dict:
-            return
-        for k, edata in edge_dict.items():
-            if edata is None:
-                continue
-            if "orig_length" not in edata and "length" in edata:
-                edata["orig_length"] = edata.get("length")
-            edata["blocked"] = True
-            edata["weight"] = float("inf")
-            blocked_edges.add((u, v, k))
-
-    edges = list(graph.edges(keys=True, data=True))
-    for u, v, key, data in edges:
-        dist = float("inf")
-        geom = data.get("geometry") if isinstance(data, dict) else None
-        if click_pt is not None and geom is not None and nearest_points is not None:
-            try:
-                nearest_on = nearest_points(click_pt, geom)[1]
-                dist = _haversine(lat, lon, nearest_on.y, nearest_on.x)
-            except Exception:
-                dist = float("inf")
-        if dist == float("inf"):
-            try:
-                n1 = graph.nodes[u]
-                n2 = graph.nodes[v]
-                mid_lat = (n1.get("y") + n2.get("y")) / 2
-                mid_lon = (n1.get("x") + n2.get("x")) / 2
-                dist = _haversine(lat, lon, mid_lat, mid_lon)
-            except Exception:
-                dist = float("inf")
-        if dist <= radius_m:
-            # Block both directions and all parallel edges between the pair.
-            mark_block(u, v)
-            mark_block(v, u)
+            pass
+    return dists
 
-    return list(blocked_edges)
+
+def _mark_blocked(graph: Any, u: Any, v: Any, blocked_edges: set) -> None:
+    """Block every parallel u->v edge in place and record it in ``blocked_edges``.
+
+    Reads the MultiDiGraph adjacency (``graph._adj[u][v]`` is ``{key: data}``)
+    directly instead of going through ``get_edge_data``.
+    """
+
+    edge_dict = graph._adj.get(u, {}).get(v)
+    if not edge_dict:
+        return
+    dirty = graph.graph.setdefault("_blocked_edge_refs", [])
+    graph.graph.setdefault("_blocked_pairs", set()).add((u, v))
+    for k, edata in edge_dict.items():
+        if edata is None:
+            continue
+        if not edata.get("blocked"):
+            # Remember the edge (and its pair, for the index patch) so resets
+            # only visit what was damaged
+            dirty.append((u, v, edata))
+        if "orig_length" not in edata and "length" in edata:
+            edata["orig_length"] = edata["length"]
+        edata["blocked"] = True
+        edata["weight"] = float("inf")
+        edata.pop("_w", None)
+        blocked_edges.add((u, v, k))
+    # Patch the search index in place instead of rebuilding it
+    set_blocked(graph, u, v)
+
+
+def block_area(graph: Any, lat: float, lon: float, radius_m: float = 50.0):
+    """Mark edges within radius as blocked; return list of blocked (u, v, key)."""
+
+    return apply_damage_area(graph, lat, lon, radius_m)
 
 
 def apply_damage_area(graph: Any, center_lat: float, center_lon: float, radius_m: float = 50.0):
@@ -200,137 +414,179 @@ def apply_damage_area(graph: Any, center_lat: float, center_lon: float, radius_m
         return []
 
     blocked_edges = set()
-    try:
-        from shapely.geometry import Point
-        from shapely.ops import nearest_points
+    edge_uvk = _edge_arrays(graph)[0]
+    for i in _edges_within(graph, center_lat, center_lon, radius_m):
+        u, v, _ = edge_uvk[i]
+        # Block both directions and all parallel edges between the pair.
+        _mark_blocked(graph, u, v, blocked_edges)
+        _mark_blocked(graph, v, u, blocked_edges)
 
-        center_pt = Point(center_lon, center_lat)
-    except Exception:
-        center_pt = None
-        nearest_points = None  # type: ignore
+    return list(blocked_edges)
 
-    def mark_block(u, v):
-        try:
-            edge_dict = graph.get_edge_data(u, v)
-        except Exception:
-            edge_dict = None
-        if not edge_dict:
-            return
-        for k, edata in edge_dict.items():
-            if edata is None:
-                continue
-            if "orig_length" not in edata and "length" in edata:
-                edata["orig_length"] = edata.get("length")
-            edata["blocked"] = True
-            edata["weight"] = float("inf")
-            blocked_edges.add((u, v, k))
-
-    for u, v, key, data in list(graph.edges(keys=True, data=True)):
-        dist = float("inf")
-        geom = data.get("geometry") if isinstance(data, dict) else None
-        if center_pt is not None and geom is not None and nearest_points is not None:
-            try:
-                nearest_on = nearest_points(center_pt, geom)[1]
-                dist = _haversine(center_lat, center_lon, nearest_on.y, nearest_on.x)
-            except Exception:
-                dist = float("inf")
-        if dist == float("inf"):
-            try:
-                n1 = graph.nodes[u]
-                n2 = graph.nodes[v]
-                mid_lat = (n1.get("y") + n2.get("y")) / 2
-                mid_lon = (n1.get("x") + n2.get("x")) / 2
-                dist = _haversine(center_lat, center_lon, mid_lat, mid_lon)
-            except Exception:
-                dist = float("inf")
-        if dist <= radius_m:
-            mark_block(u, v)
-            mark_block(v, u)
 
-    return list(blocked_edges)
+def blocked_pairs(graph: Any) -> set:
+    """Directed (u, v) node pairs whose edges are blocked since the last reset."""
+
+    return graph.graph.get("_blocked_pairs", set())
+
+
+def block_edges(graph: Any, edges: Iterable[Tuple[Any, Any, Any]]) -> None:
+    """Re-block (u, v, key) edges returned by an earlier damage call.
+
+    Lets a recorded scenario be replayed without rescanning edge distances.
+    """
+
+    if graph is None:
+        return
+
+    blocked_edges = set()
+    for u, v in {(u, v) for u, v, _ in edges}:
+        _mark_blocked(graph, u, v, blocked_edges)
+
 
+def _reset_targets(graph: Any, hard_reset: bool, clear: bool) -> List[Tuple[Any, Any, dict]]:
+    """(u, v, data) of the edges a reset has to visit.
+
+    Normally only the edges blocked since the last clearing reset (tracked by
+    ``_mark_blocked``); ``hard_reset`` walks every edge instead. ``clear``
+    forgets the tracked edges once the caller fully restores them.
+    """
 
-def reset_graph_damage(graph: Any) -> None:
-    """Hard reset damage flags and weights across the entire graph."""
+    # Every reset clears the blocked flags, so the blocked pair set goes too.
+    graph.graph.pop("_blocked_pairs", None)
+    if hard_reset:
+        if clear:
+            graph.graph.pop("_blocked_edge_refs", None)
+        return list(graph.edges(data=True))
+    if clear:
+        return graph.graph.pop("_blocked_edge_refs", None) or []
+    return list(graph.graph.get("_blocked_edge_refs", ()))
+
+
+def _refresh_index(graph: Any, hard_reset: bool, restored: set) -> None:
+    """Bring the search index in line with the (u, v) pairs a reset restored.
+
+    Tracked resets patch those pairs in place, so a reset followed by a
+    search stays proportional to the damage; a hard reset may have touched
+    untracked edges and drops the index instead. Untouched graphs keep their
+    index (and cached routes).
+    """
+
+    if not restored:
+        return
+    if hard_reset:
+        invalidate_index(graph)
+    else:
+        set_blocked_pairs(graph, restored, False)
+
+
+def reset_graph_damage(graph: Any, hard_reset: bool = False) -> None:
+    """Reset damage flags and weights on damaged edges (every edge if ``hard_reset``)."""
 
     if graph is None:
         return
 
-    for _, _, _, data in graph.edges(keys=True, data=True):
+    restored = set()
+    for u, v, data in _reset_targets(graph, hard_reset, clear=True):
         if data is None:
             continue
-        data.pop("blocked", None)
+        edge_changed = data.pop("blocked", None) is not None
         if "orig_length" in data:
             base_len = data.get("orig_length")
         else:
             base_len = data.get("length")
         if base_len is not None:
+            if data.get("length") != base_len or data.get("weight") != base_len:
+                edge_changed = True
             data["length"] = base_len
             data["weight"] = base_len
-        else:
-            data.pop("weight", None)
+        elif data.pop("weight", None) is not None:
+            edge_changed = True
+        if edge_changed:
+            data.pop("_w", None)
+            restored.add((u, v))
+    _refresh_index(graph, hard_reset, restored)
 
 
-def reset_graph_weights(graph: Any) -> None:
+def reset_graph_weights(graph: Any, hard_reset: bool = False) -> None:
     """Clear blocked flags and restore original lengths when available."""
 
     if graph is None:
         return
-    for u, v, key, data in graph.edges(keys=True, data=True):
+    restored = set()
+    # Weights stay as they are here, so the damaged edges remain tracked for
+    # a later full reset.
+    for u, v, data in _reset_targets(graph, hard_reset, clear=False):
         if data.get("blocked"):
             data.pop("blocked", None)
-        if "orig_length" in data:
+            restored.add((u, v))
+        if "orig_length" in data and data.get("length") != data["orig_length"]:
             data["length"] = data.get("orig_length")
+            data.pop("_w", None)
+            restored.add((u, v))
+    _refresh_index(graph, hard_reset, restored)
+
 
+def reset_graph_state(graph: Any, hard_reset: bool = False) -> None:
+    """Fully reset edge state: clear block flags and restore weights/lengths.
 
-def reset_graph_state(graph: Any) -> None:
-    """Fully reset edge state: clear block flags and restore weights/lengths."""
+    Only edges blocked since the last reset are visited unless ``hard_reset``.
+    """
 
     if graph is None:
         return
 
-    for _, _, _, data in graph.edges(keys=True, data=True):
+    restored = set()
+    for u, v, data in _reset_targets(graph, hard_reset, clear=True):
         # Clear blocked flag
-        if data.get("blocked"):
-            data.pop("blocked", None)
+        edge_changed = bool(data.pop("blocked", False))
 
-        # Restore base length
-        base_len = None
-        if "orig_length" in data:
-            base_len = data.get("orig_length")
-        elif "length" in data:
-            base_len = data.get("length")
+        # Restore base length; orig_length is re-recorded on the next block
+        length = data.get("length")
+        base_len = data.pop("orig_length", length)
 
         if base_len is not None:
-            data["length"] = base_len
-            data["weight"] = base_len
-        else:
+            if length != base_len or data.get("weight") != base_len:
+                data["length"] = data["weight"] = base_len
+                edge_changed = True
+        elif data.pop("weight", None) is not None:
             # If no length info, drop weight to avoid stale infinities
-            data.pop("weight", None)
+            edge_changed = True
 
+        # Only touched edges lose their cached numeric weight
+        if edge_changed:
+            data.pop("_w", None)
+            restored.add((u, v))
+    _refresh_index(graph, hard_reset, restored)
 
-def simulate_scattered_damage(graph: Any, count: int = 10):
+
+def simulate_scattered_damage(graph: Any, count: int = 10, seed: Optional[int] = None):
     """Scatter small debris pockets (15-20m radius) directly on road geometry.
 
     Picks random edges, finds their midpoint (geometry-aware), and blocks around it.
+    A ``seed`` makes the scenario repeatable; otherwise the global RNG is used.
     Returns a list of tuples: (lat, lon, radius_m, blocked_edges)
     """
 
-    if graph is None or len(graph.edges) == 0:
+    if graph is None:
         return []
 
-    all_edges = list(graph.edges(data=True))
-    if not all_edges:
+    # Sample edge positions rather than materializing the edge list; the
+    # picks match random.sample over list(graph.edges()) for the same seed.
+    # The cached edge list also answers "no edges" without len(graph.edges),
+    # which walks every node's adjacency on a MultiDiGraph.
+    edge_uvk, mid_lats, mid_lons, geoms, _ = _edge_arrays(graph)
+    if not edge_uvk:
         return []
 
-    pick_count = min(count, len(all_edges))
-    chosen = random.sample(all_edges, pick_count)
+    rng = random.Random(seed) if seed is not None else random
+    pick_count = min(count, len(edge_uvk))
 
-    results: List[tuple] = []
-    for u, v, data in chosen:
+    centers: List[tuple] = []
+    for i in rng.sample(range(len(edge_uvk)), pick_count):
         lat = None
         lon = None
-        geom = data.get("geometry") if isinstance(data, dict) else None
+        geom = geoms[i]
         if geom is not None:
             try:
                 # Use shapely midpoint along the linestring
@@ -341,32 +597,196 @@ def simulate_scattered_damage(graph: Any, count: int = 10):
                 lat = None
                 lon = None
         if lat is None or lon is None:
-            try:
-                lat = (graph.nodes[u]["y"] + graph.nodes[v]["y"]) / 2
-                lon = (graph.nodes[u]["x"] + graph.nodes[v]["x"]) / 2
-            except Exception:
+            lat = float(mid_lats[i])
+            lon = float(mid_lons[i])
+            if np.isnan(lat) or np.isnan(lon):
                 continue
-        radius = random.uniform(15.0, 20.0)
-        blocked = block_area(graph, lat, lon, radius)
-        results.append((lat, lon, radius, blocked))
+        centers.append((lat, lon, rng.uniform(15.0, 20.0)))
+
+    # Pockets often overlap; each directed pair is mutated once and its blocked
+    # (u, v, key) list reused for every pocket that hits it.
+    pair_edges: dict = {}
+
+    def block_pair(u, v):
+        edges = pair_edges.get((u, v))
+        if edges is None:
+            found: set = set()
+            _mark_blocked(graph, u, v, found)
+            edges = pair_edges[(u, v)] = list(found)
+        return edges
+
+    results: List[tuple] = []
+    for lat, lon, radius in centers:
+        blocked = set()
+        for i in _edges_within(graph, lat, lon, radius):
+            u, v, _ = edge_uvk[i]
+            blocked.update(block_pair(u, v))
+            blocked.update(block_pair(v, u))
+        results.append((lat, lon, radius, list(blocked)))
     return results
 
 
-def _nearest_node_haversine(graph: Any, lat: float, lon: float) -> Any:
-    """Naive nearest neighbor using haversine distance over all nodes."""
+def _node_arrays(graph: Any) -> Tuple[List[Any], Any, Any]:
+    """Return cached (node_ids, lats, lons) for nodes that carry coordinates."""
+
+    cached = _NODE_ARRAY_CACHE.get(graph)
+    if cached is not None:
+        return cached
 
-    best_node = None
-    best_dist = float("inf")
+    node_ids: List[Any] = []
+    lats: List[float] = []
+    lons: List[float] = []
     for node_id, data in graph.nodes(data=True):
         nlat = data.get("y")
         nlon = data.get("x")
         if nlat is None or nlon is None:
             continue
-        d = _haversine(lat, lon, nlat, nlon)
-        if d < best_dist:
-            best_dist = d
-            best_node = node_id
-    return best_node
+        node_ids.append(node_id)
+        lats.append(nlat)
+        lons.append(nlon)
+
+    cached = (node_ids, np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64))
+    _NODE_ARRAY_CACHE[graph] = cached
+    return cached
+
+
+def _node_trig(graph: Any) -> Tuple[Any, Any, Any]:
+    """Return cached (lat_rad, lon_rad, cos_lat) arrays matching ``_node_arrays``."""
+
+    cached = _NODE_TRIG_CACHE.get(graph)
+    if cached is not None:
+        return cached
+
+    _, lats, lons = _node_arrays(graph)
+    lat_rad = np.radians(lats)
+    cached = (lat_rad, np.radians(lons), np.cos(lat_rad))
+    _NODE_TRIG_CACHE[graph] = cached
+    return cached
+
+
+def _node_kdtree(graph: Any) -> Tuple[Any, List[Any], float]:
+    """Build (once per graph) a KD-tree on (x * cos(lat0), y) node coordinates."""
+
+    cached = _KDTREE_CACHE.get(graph)
+    if cached is not None:
+        return cached
+
+    node_ids, lats, lons = _node_arrays(graph)
+    lat0 = float(lats.mean()) if node_ids else 0.0
+    tree = None
+    if node_ids:
+        tree = cKDTree(np.column_stack([lons * np.cos(np.radians(lat0)), lats]))
+    cached = (tree, node_ids, lat0)
+    _KDTREE_CACHE[graph] = cached
+    return cached
+
+
+def _nearest_node_haversine(graph: Any, lat: float, lon: float) -> Any:
+    """Nearest node via a cached equirectangular KD-tree.
+
+    Falls back to a vectorized haversine scan over all nodes when scipy is missing.
+    """
+
+    if cKDTree is not None:
+        tree, node_ids, lat0 = _node_kdtree(graph)
+        if tree is None:
+            return None
+        _, idx = tree.query([lon * cos(radians(lat0)), lat])
+        return node_ids[int(idx)]
+
+    node_ids = _node_arrays(graph)[0]
+    if not node_ids:
+        return None
+    if len(node_ids) >= _MORTON_MIN_NODES:
+        return node_ids[_nearest_node_morton(graph, lat, lon)]
+    return node_ids[int(np.argmin(_haversine_term_rad(lat, lon, *_node_trig(graph))))]
+
+
+# Below this many nodes a single vectorized scan beats the z-order search.
+_MORTON_MIN_NODES = 10000
+_MORTON_SCALE = float(2**32 - 1)
+
+
+def _morton_spread(v: Any) -> Any:
+    """Spread the low 32 bits of each uint64 so they occupy the even bit positions."""
+
+    v = v & np.uint64(0xFFFFFFFF)
+    for shift, mask in (
+        (16, 0x0000FFFF0000FFFF),
+        (8, 0x00FF00FF00FF00FF),
+        (4, 0x0F0F0F0F0F0F0F0F),
+        (2, 0x3333333333333333),
+        (1, 0x5555555555555555),
+    ):
+        v = (v | (v << np.uint64(shift))) & np.uint64(mask)
+    return v
+
+
+def _morton_quantize(values: Any, lo: float, span: float) -> Any:
+    q = np.clip((np.asarray(values, dtype=np.float64) - lo) / span, 0.0, 1.0) * _MORTON_SCALE
+    return q.astype(np.uint64)
+
+
+def _morton_index(graph: Any) -> Tuple[Any, ...]:
+    """Build (once per graph) node positions sorted by interleaved lat/lon bits.
+
+    Returns (z_sorted, qx_sorted, qy_sorted, order, lon_lo, lon_span, lat_lo, lat_span)
+    where ``order`` maps sorted positions back to ``_node_arrays`` indices.
+    """
+
+    cached = _MORTON_CACHE.get(graph)
+    if cached is not None:
+        return cached
+
+    _, lats, lons = _node_arrays(graph)
+    lon_lo, lat_lo = float(lons.min()), float(lats.min())
+    lon_span = max(float(lons.max()) - lon_lo, 1e-12)
+    lat_span = max(float(lats.max()) - lat_lo, 1e-12)
+    qx = _morton_quantize(lons, lon_lo, lon_span)
+    qy = _morton_quantize(lats, lat_lo, lat_span)
+    z = _morton_spread(qx) | (_morton_spread(qy) << np.uint64(1))
+    order = np.argsort(z, kind="stable")
+    cached = (z[order], qx[order], qy[order], order, lon_lo, lon_span, lat_lo, lat_span)
+    _MORTON_CACHE[graph] = cached
+    return cached
+
+
+def _nearest_node_morton(graph: Any, lat: float, lon: float) -> int:
+    """Exact nearest node (index into ``_node_arrays``) via a z-order range scan.
+
+    A lat/lon box of radius r is converted to its z-range (lower-left corner to
+    upper-right corner), only that slice is scanned, and nodes outside the box
+    are dropped. The best hit is final once it lies within r; otherwise the
+    box grows until it spans the whole graph.
+    """
+
+    z_sorted, qx_sorted, qy_sorted, order, lon_lo, lon_span, lat_lo, lat_span = _morton_index(graph)
+    _, lats, lons = _node_arrays(graph)
+
+    radius_m = 50.0
+    while True:
+        dlat = radius_m / _M_PER_DEG
+        # Widen longitude for the box edge farthest from the equator.
+        dlon = dlat / max(cos(radians(min(abs(lat) + dlat, 89.9))), 1e-6)
+        qx0, qx1 = _morton_quantize([lon - dlon, lon + dlon], lon_lo, lon_span)
+        qy0, qy1 = _morton_quantize([lat - dlat, lat + dlat], lat_lo, lat_span)
+        z0 = _morton_spread(qx0) | (_morton_spread(qy0) << np.uint64(1))
+        z1 = _morton_spread(qx1) | (_morton_spread(qy1) << np.uint64(1))
+        lo = int(np.searchsorted(z_sorted, z0, side="left"))
+        hi = int(np.searchsorted(z_sorted, z1, side="right"))
+
+        qx, qy = qx_sorted[lo:hi], qy_sorted[lo:hi]
+        inside = np.flatnonzero((qx >= qx0) & (qx <= qx1) & (qy >= qy0) & (qy <= qy1))
+        covers_all = lo == 0 and hi == len(z_sorted) and inside.size == hi
+        if inside.size:
+            idx = order[lo + inside]
+            dists = _haversine_vec(lat, lon, lats[idx], lons[idx])
+            best = int(np.argmin(dists))
+            if dists[best] <= radius_m or covers_all:
+                return int(idx[best])
+        elif covers_all:
+            return int(order[0])
+        radius_m *= 4.0
 
 
 def _haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
@@ -378,6 +798,94 @@ def _haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     return R * c
 
 
+def _haversine_partial(lat1: float, lon1: float) -> Tuple[float, float, float]:
+    """Query-side terms of ``_haversine`` for reuse against many points."""
+
+    rlat1 = radians(lat1)
+    return rlat1, radians(lon1), cos(rlat1)
+
+
+def _haversine_from_partial(partial: Tuple[float, float, float], lat2: float, lon2: float) -> float:
+    """``_haversine`` from a precomputed ``_haversine_partial`` to one point."""
+
+    rlat1, rlon1, cos_lat1 = partial
+    rlat2 = radians(lat2)
+    a = sin((rlat2 - rlat1) / 2) ** 2 + cos_lat1 * cos(rlat2) * sin((radians(lon2) - rlon1) / 2) ** 2
+    return 12742000.0 * asin(sqrt(a))
+
+
+def _haversine_vec(lat1: float, lon1: float, lat2_arr: Any, lon2_arr: Any) -> Any:
+    """Haversine distance in meters from one point to arrays of points.
+
+    Computes in the arrays' own precision, so float32 midpoints stay float32.
+    """
+
+    R = 6371000.0
+    a = _haversine_term(lat1, lon1, lat2_arr, lon2_arr)
+    c = 2 * np.arcsin(np.sqrt(a))
+    return R * c
+
+
+def _haversine_term(lat1: float, lon1: float, lat2_arr: Any, lon2_arr: Any) -> Any:
+    """The haversine ``a`` term; monotonic in distance, so enough for an argmin."""
+
+    lat2 = np.radians(lat2_arr)
+    return _haversine_term_rad(lat1, lon1, lat2, np.radians(lon2_arr), np.cos(lat2))
+
+
+def _haversine_term_rad(
+    lat1: float, lon1: float, lat2_rad: Any, lon2_rad: Any, cos_lat2: Any
+) -> Any:
+    """``_haversine_term`` against points already in radians, with their cos(lat)."""
+
+    dlat = lat2_rad - radians(lat1)
+    dlon = lon2_rad - radians(lon1)
+    return np.sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos_lat2 * np.sin(dlon / 2) ** 2
+
+
+# Below this many points NumPy beats the parallel kernel's thread start-up.
+_PARALLEL_SCAN_MIN = 4096
+
+
+def _haversine_scan(lat1: float, lon1: float, lat2_arr: Any, lon2_arr: Any) -> Any:
+    """Parallel (numba) equivalent of ``_haversine_vec`` for large arrays."""
+
+    R = 6371000.0
+    rlat1 = radians(lat1)
+    rlon1 = radians(lon1)
+    cos_lat1 = cos(rlat1)
+    out = np.empty(lat2_arr.shape[0])
+    for i in prange(lat2_arr.shape[0]):
+        lat2 = radians(lat2_arr[i])
+        dlat = lat2 - rlat1
+        dlon = radians(lon2_arr[i]) - rlon1
+        a = sin(dlat / 2) ** 2 + cos_lat1 * cos(lat2) * sin(dlon / 2) ** 2
+        out[i] = 2 * R * asin(sqrt(a))
+    return out
+
+
+@lru_cache(maxsize=None)
+def _parallel_scan() -> Any:
+    """``_haversine_scan`` compiled with numba, or None without a working numba.
+
+    Compiled (or loaded from numba's cache) on the first large scan, so
+    importing this module and small damage clicks never pay for it.
+    """
+
+    if njit is None:
+        return None
+    # No "nnan" fast-math flag: midpoints of edges without coordinates are NaN
+    # and must keep failing the radius test.
+    scan = njit(
+        parallel=True, cache=True, fastmath={"nsz", "arcp", "contract", "afn", "reassoc"}
+    )(_haversine_scan)
+    try:
+        scan(0.0, 0.0, np.zeros(1, np.float32), np.zeros(1, np.float32))
+    except Exception:  # pragma: no cover - broken numba install
+        return None
+    return scan
+
+
 # Backward compatibility for existing callers.
 def get_graph(place_name: str) -> Any:
     return load_graph(place_name)
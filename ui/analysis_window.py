@@ -3,50 +3,158 @@
 from __future__ import annotations
 
 import math
+import os
 import time
-from typing import Any, Dict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
 
-import plotly.graph_objects as go
-import plotly.io as pio
-from plotly.subplots import make_subplots
-from PyQt6.QtWebEngineWidgets import QWebEngineView
-from PyQt6.QtWidgets import QVBoxLayout, QWidget
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QUrl, pyqtSignal
+from PyQt6.QtWidgets import QMessageBox, QVBoxLayout, QWidget
 
-from core.algorithms import astar_search, dijkstra_search
+from core.algorithms import astar_search, dijkstra_search, graph_version, prepare_searches
 
-# Apply a global dark template for all figures.
-pio.templates.default = "plotly_dark"
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+# DOM id of the dashboard div, targeted by Plotly.react updates.
+_DASHBOARD_DIV = "analysis-dashboard"
+
+
+@lru_cache(maxsize=None)
+def _plotly() -> Tuple[Any, Any, Callable[..., Any]]:
+    """Import Plotly on first use and return (graph_objects, io, make_subplots).
+
+    Plotly is only needed once a comparison runs, so it stays out of startup.
+    """
+    import plotly.graph_objects as go
+    import plotly.io as pio
+    from plotly.subplots import make_subplots
+
+    # Apply a global dark template for all figures.
+    pio.templates.default = "plotly_dark"
+    return go, pio, make_subplots
+
+
+@lru_cache(maxsize=None)
+def _plotly_js_dir() -> str:
+    """Directory holding Plotly's bundled plotly.min.js, or "" if it is missing."""
+    import plotly
+
+    directory = os.path.join(os.path.dirname(plotly.__file__), "package_data")
+    return directory if os.path.isfile(os.path.join(directory, "plotly.min.js")) else ""
+
+
+def _timed(fn: Callable[..., Any], *args: Any) -> Tuple[Any, float]:
+    """Run ``fn`` and return (result, elapsed wall-clock seconds)."""
+    t0 = time.perf_counter_ns()
+    result = fn(*args)
+    return result, (time.perf_counter_ns() - t0) / 1e9
+
+
+class _ComparisonSignals(QObject):
+    """Signals a _ComparisonRunner delivers back on the GUI thread."""
+
+    finished = pyqtSignal(object, object)  # (result, seconds) for Dijkstra, A*
+    failed = pyqtSignal(str)
+
+
+class _ComparisonRunner(QRunnable):
+    """Times Dijkstra and A* off the GUI thread.
+
+    ``version`` is the graph version the comparison starts from; damage
+    applied while it runs makes the result stale.
+    """
+
+    def __init__(self, graph: Any, start_node: Any, end_node: Any) -> None:
+        super().__init__()
+        self.args = (graph, start_node, end_node)
+        self.version = graph_version(graph)
+        self.signals = _ComparisonSignals()
+
+    def run(self) -> None:
+        try:
+            # Index build and kernel compilation are one-time costs; keep them
+            # out of the timed region.
+            prepare_searches(self.args[0])
+            # Timed one after the other: run together, each wall-clock figure
+            # would include the other search competing for the CPU (or GIL).
+            results = _timed(dijkstra_search, *self.args), _timed(astar_search, *self.args)
+        except Exception as exc:
+            self.signals.failed.emit(str(exc))
+            return
+        self.signals.finished.emit(*results)
 
 
 class AnalysisWindow(QWidget):
     """Renders algorithm comparison charts as a Plotly dashboard."""
 
+    # True while a comparison is in flight; the owner holds graph edits meanwhile.
+    comparison_busy = pyqtSignal(bool)
+
     def __init__(self, parent=None) -> None:
         super().__init__(parent)
+        # Deferred so importing this module does not pull in Chromium.
+        from PyQt6.QtWebEngineWidgets import QWebEngineView
+
         self.browser = QWebEngineView()
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.addWidget(self.browser)
 
+        # The page (and Plotly.js) is loaded once; later runs only push data.
+        self._figure = None
+        self._page_ready = False
+        self._page_loading = False
+        self.browser.loadFinished.connect(self._on_load_finished)
+
+        # At most one comparison in flight; a newer request waits for it.
+        self._runner: Optional[_ComparisonRunner] = None
+        self._pending: Optional[Tuple[Any, Any, Any]] = None
+
     def start_comparison_test(self, graph: Any, start_node: Any, end_node: Any) -> None:
         if graph is None or start_node is None or end_node is None:
             return
 
-        # Dijkstra metrics
-        t0 = time.perf_counter()
-        path_d, visit_d, len_d, _ = dijkstra_search(graph, start_node, end_node)
-        time_d = time.perf_counter() - t0
+        if self._runner is not None:
+            self._pending = (graph, start_node, end_node)
+            return
+
+        runner = _ComparisonRunner(graph, start_node, end_node)
+        runner.signals.finished.connect(self._on_comparison_finished)
+        runner.signals.failed.connect(self._on_comparison_failed)
+        self._runner = runner
+        self.comparison_busy.emit(True)
+        QThreadPool.globalInstance().start(runner)
+
+    def _on_comparison_finished(self, dijkstra_result: Any, astar_result: Any) -> None:
+        runner, self._runner = self._runner, None
+        if runner.version != graph_version(runner.args[0]):
+            # The graph changed while it ran: rerun unless a newer one waits.
+            if self._pending is None:
+                self._pending = runner.args
+        else:
+            (path_d, visit_d, len_d, _), time_d = dijkstra_result
+            (path_a, visit_a, len_a, _), time_a = astar_result
+
+            dijkstra_metrics = self._build_metrics("Dijkstra", visit_d, time_d, len_d, path_d)
+            astar_metrics = self._build_metrics("A*", visit_a, time_a, len_a, path_a)
+
+            self.update_charts(dijkstra_metrics, astar_metrics)
 
-        # A* metrics
-        t1 = time.perf_counter()
-        path_a, visit_a, len_a, _ = astar_search(graph, start_node, end_node)
-        time_a = time.perf_counter() - t1
+        self._start_pending()
 
-        dijkstra_metrics = self._build_metrics("Dijkstra", visit_d, time_d, len_d, path_d)
-        astar_metrics = self._build_metrics("A*", visit_a, time_a, len_a, path_a)
+    def _on_comparison_failed(self, message: str) -> None:
+        self._runner = None
+        QMessageBox.warning(self, "Uyarı", f"Analiz başarısız oldu: {message}")
+        self._start_pending()
 
-        self.update_charts(dijkstra_metrics, astar_metrics)
+    def _start_pending(self) -> None:
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            self.start_comparison_test(*pending)
+        if self._runner is None:
+            self.comparison_busy.emit(False)
 
     def _build_metrics(
         self, name: str, visited: int, time_s: float, path_len: float, path: Any
@@ -73,6 +181,43 @@ class AnalysisWindow(QWidget):
         return max(min(score, 100.0), 0.0)
 
     def update_charts(self, dijkstra_metrics: Dict[str, Any], astar_metrics: Dict[str, Any]) -> None:
+        if self._figure is None:
+            self._figure = self._build_figure()
+        self._apply_metrics(self._figure, dijkstra_metrics, astar_metrics)
+
+        if self._page_ready:
+            self._react()
+        elif not self._page_loading:
+            self._page_loading = True
+            # Plotly.js comes from the installed package when possible: no CDN
+            # round trip, and the dashboard also works offline.
+            js_dir = _plotly_js_dir()
+            html_content = self._figure.to_html(
+                include_plotlyjs="plotly.min.js" if js_dir else "cdn", div_id=_DASHBOARD_DIV
+            )
+            if js_dir:
+                self.browser.setHtml(html_content, QUrl.fromLocalFile(js_dir + os.sep))
+            else:
+                self.browser.setHtml(html_content)
+        # Otherwise the page is still loading; _on_load_finished pushes the latest data.
+
+    def _on_load_finished(self, ok: bool) -> None:
+        self._page_loading = False
+        self._page_ready = ok
+        if ok and self._figure is not None:
+            self._react()
+
+    def _react(self) -> None:
+        """Diff-update the loaded dashboard in place via Plotly.react."""
+        pio = _plotly()[1]
+        payload = pio.to_json(self._figure, validate=False)
+        self.browser.page().runJavaScript(
+            f"var fig = {payload}; Plotly.react('{_DASHBOARD_DIV}', fig.data, fig.layout);"
+        )
+
+    def _build_figure(self) -> go.Figure:
+        """Create the dashboard layout and empty traces once; values come from _apply_metrics."""
+        go, _, make_subplots = _plotly()
         fig = make_subplots(
             rows=2,
             cols=2,
@@ -94,14 +239,8 @@ class AnalysisWindow(QWidget):
         # Search effort (visited nodes)
         fig.add_trace(
             go.Bar(
-                x=[dijkstra_metrics["name"], astar_metrics["name"]],
-                y=[dijkstra_metrics["visited"], astar_metrics["visited"]],
                 marker_color=[neon_pink, neon_blue],
                 name="Search Effort",
-                customdata=[
-                    [dijkstra_metrics["name"], dijkstra_metrics["visited"], "Orta"],
-                    [astar_metrics["name"], astar_metrics["visited"], "Yüksek"],
-                ],
                 hovertemplate="Algoritma: %{customdata[0]}<br>Değer: %{customdata[1]} Node<br>Verimlilik: %{customdata[2]}",
             ),
             row=1,
@@ -111,14 +250,8 @@ class AnalysisWindow(QWidget):
         # Memory usage (heuristic MB)
         fig.add_trace(
             go.Bar(
-                x=[dijkstra_metrics["name"], astar_metrics["name"]],
-                y=[dijkstra_metrics["memory_mb"], astar_metrics["memory_mb"]],
                 marker_color=[neon_blue, neon_pink],
                 name="Memory (MB)",
-                customdata=[
-                    [dijkstra_metrics["name"], dijkstra_metrics["memory_mb"], "Tahmini"],
-                    [astar_metrics["name"], astar_metrics["memory_mb"], "Tahmini"],
-                ],
                 hovertemplate="Algoritma: %{customdata[0]}<br>Değer: %{y:.3f} MB<br>Verimlilik: %{customdata[2]}",
             ),
             row=1,
@@ -128,15 +261,9 @@ class AnalysisWindow(QWidget):
         # Time performance (horizontal bar)
         fig.add_trace(
             go.Bar(
-                y=[dijkstra_metrics["name"], astar_metrics["name"]],
-                x=[dijkstra_metrics["time_s"], astar_metrics["time_s"]],
                 marker_color=[neon_pink, neon_blue],
                 name="Time (s)",
                 orientation="h",
-                customdata=[
-                    [dijkstra_metrics["name"], dijkstra_metrics["time_s"], "Orta"],
-                    [astar_metrics["name"], astar_metrics["time_s"], "Yüksek"],
-                ],
                 hovertemplate="Algoritma: %{customdata[0]}<br>Değer: %{x:.3f} sn<br>Verimlilik: %{customdata[2]}",
             ),
             row=2,
@@ -147,7 +274,6 @@ class AnalysisWindow(QWidget):
         fig.add_trace(
             go.Indicator(
                 mode="gauge+number",
-                value=astar_metrics["efficiency"],
                 gauge={
                     "axis": {"range": [0, 100]},
                     "bar": {"color": neon_blue},
@@ -172,6 +298,36 @@ class AnalysisWindow(QWidget):
             paper_bgcolor="rgba(0,0,0,1)",
             plot_bgcolor="rgba(0,0,0,1)",
         )
+        return fig
 
-        html_content = fig.to_html(include_plotlyjs="cdn")
-        self.browser.setHtml(html_content)
\ No newline at end of file
+    def _apply_metrics(
+        self, fig: go.Figure, dijkstra_metrics: Dict[str, Any], astar_metrics: Dict[str, Any]
+    ) -> None:
+        names = [dijkstra_metrics["name"], astar_metrics["name"]]
+        effort, memory, timing, gauge = fig.data
+        with fig.batch_update():
+            effort.update(
+                x=names,
+                y=[dijkstra_metrics["visited"], astar_metrics["visited"]],
+                customdata=[
+                    [dijkstra_metrics["name"], dijkstra_metrics["visited"], "Orta"],
+                    [astar_metrics["name"], astar_metrics["visited"], "Yüksek"],
+                ],
+            )
+            memory.update(
+                x=names,
+                y=[dijkstra_metrics["memory_mb"], astar_metrics["memory_mb"]],
+                customdata=[
+                    [dijkstra_metrics["name"], dijkstra_metrics["memory_mb"], "Tahmini"],
+                    [astar_metrics["name"], astar_metrics["memory_mb"], "Tahmini"],
+                ],
+            )
+            timing.update(
+                y=names,
+                x=[dijkstra_metrics["time_s"], astar_metrics["time_s"]],
+                customdata=[
+                    [dijkstra_metrics["name"], dijkstra_metrics["time_s"], "Orta"],
+                    [astar_metrics["name"], astar_metrics["time_s"], "Yüksek"],
+                ],
+            )
+            gauge.update(value=astar_metrics["efficiency"])
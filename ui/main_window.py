@@ -2,13 +2,20 @@
 
 from __future__ import annotations
 
-from typing import Optional
+import re
+from collections import OrderedDict
+from functools import lru_cache
+from math import asin, cos, radians, sin, sqrt
+from typing import Any, Dict, List, Optional, Tuple
 
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
 from PyQt6.QtWidgets import (
+    QComboBox,
     QHBoxLayout,
     QLineEdit,
     QMainWindow,
     QPushButton,
+    QSpinBox,
     QStackedWidget,
     QTextEdit,
     QMessageBox,
@@ -17,7 +24,7 @@ from PyQt6.QtWidgets import (
 )
 
 from config import DEFAULT_LOCATION, WINDOW_SIZE, WINDOW_TITLE
-from core.algorithms import astar_search, dijkstra_search
+from core.algorithms import cached_search, graph_version
 from core.coordinate_sys import CoordinateTransformer, GeoPoint
 from core.data_manager import (
     get_nearest_edge_point,
@@ -25,6 +32,7 @@ from core.data_manager import (
     load_graph,
     block_area,
     apply_damage_area,
+    block_edges,
     reset_graph_weights,
     reset_graph_state,
     reset_graph_damage,
@@ -33,6 +41,124 @@ from core.data_manager import (
 from ui.map_canvas import InteractiveMap
 from ui.analysis_window import AnalysisWindow
 
+# Road projections kept per window; coordinates are keyed at 1e-6 degrees,
+# the precision the lat/lon text fields are written with.
+_NEAREST_CACHE_SIZE = 256
+_NEAREST_SCALE = 1e6
+# Log lines are coalesced and appended at most this often; the view keeps
+# only the most recent blocks.
+_LOG_FLUSH_MS = 50
+_LOG_MAX_BLOCKS = 2000
+
+
+# "lat, lon" pairs: optional sign, decimals and exponent; nan/inf are rejected.
+_NUMBER = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+_LATLON_RE = re.compile(rf"\s*({_NUMBER})\s*,\s*({_NUMBER})\s*")
+
+
+def _coord_key(lat: float, lon: float) -> Tuple[int, int]:
+    return round(lat * _NEAREST_SCALE), round(lon * _NEAREST_SCALE)
+
+
+@lru_cache(maxsize=64)
+def _parse_geo_text(text: str) -> Optional[GeoPoint]:
+    """Parse 'lat, lon'; memoized because routes re-read unchanged inputs."""
+    match = _LATLON_RE.fullmatch(text)
+    if match is None:
+        return None
+    return GeoPoint(lat=float(match.group(1)), lon=float(match.group(2)))
+
+
+# Route search modes offered in the UI: mode -> (display name, route color).
+_ALGORITHMS: Dict[str, Tuple[str, str]] = {
+    "dijkstra": ("Dijkstra", "#e74c3c"),
+    "astar": ("A*", "#27ae60"),
+    "bidirectional": ("Çift Yönlü Dijkstra", "#2980b9"),
+}
+
+
+@lru_cache(maxsize=4096)
+def _haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle meters; memoized since walk legs repeat across route reruns."""
+    R = 6371000.0
+    dlat = radians(lat2 - lat1)
+    dlon = radians(lon2 - lon1)
+    a = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
+    c = 2 * asin(sqrt(a))
+    return R * c
+
+
+class _GraphLoadSignals(QObject):
+    """Signals a _GraphLoader delivers back on the GUI thread."""
+
+    log = pyqtSignal(str)
+    finished = pyqtSignal(object, object, object)  # graph, buildings, transformer
+    failed = pyqtSignal(str)
+
+
+class _GraphLoader(QRunnable):
+    """Downloads the road graph and buildings off the GUI thread."""
+
+    def __init__(self, place_name: str) -> None:
+        super().__init__()
+        self.place_name = place_name
+        self.signals = _GraphLoadSignals()
+
+    def run(self) -> None:
+        try:
+            graph = load_graph(self.place_name)
+            bld = None
+            try:
+                bld = load_buildings(self.place_name)
+                if getattr(bld, "crs", None) and bld.crs and not bld.crs.is_geographic:
+                    bld = bld.to_crs("EPSG:4326")
+                self.signals.log.emit(f"Bina verisi yüklendi: {len(bld)} kayıt; CRS={bld.crs}")
+            except Exception as exc:
+                bld = None
+                self.signals.log.emit(f"Bina verisi yüklenemedi: {exc}")
+            transformer = CoordinateTransformer(
+                graph,
+                screen_width=int(WINDOW_SIZE[0] * 0.7),
+                screen_height=WINDOW_SIZE[1],
+            )
+        except Exception as exc:
+            self.signals.failed.emit(str(exc))
+            return
+        self.signals.finished.emit(graph, bld, transformer)
+
+
+class _RouteSignals(QObject):
+    """Signals a _RouteSearch delivers back on the GUI thread."""
+
+    finished = pyqtSignal(object)  # (path, visited, total_dist, success)
+    failed = pyqtSignal(str)
+
+
+class _RouteSearch(QRunnable):
+    """Runs one route search off the GUI thread.
+
+    ``context`` snapshots the inputs the result is drawn with, so picks made
+    while the search runs do not mix into its route.
+    """
+
+    def __init__(self, graph: Any, mode: str, context: Dict[str, Any]) -> None:
+        super().__init__()
+        self.graph = graph
+        self.mode = mode
+        self.context = context
+        self.version = graph_version(graph)
+        self.signals = _RouteSignals()
+
+    def run(self) -> None:
+        try:
+            result = cached_search(
+                self.graph, self.context["start_node"], self.context["end_node"], self.mode
+            )
+        except Exception as exc:
+            self.signals.failed.emit(str(exc))
+            return
+        self.signals.finished.emit(result)
+
 
 class OperationWindow(QMainWindow):
     """Primary application window with operation and analysis pages."""
@@ -48,7 +174,7 @@ class OperationWindow(QMainWindow):
         self.graph = None
         self.transformer = None
         self.buildings = None
-        self.current_algorithm = "dijkstra"  # or "astar"
+        self.current_algorithm = "dijkstra"  # a key of _ALGORITHMS
         self._pick_mode = None  # "start" or "end"
         self.start_node = None
         self.end_node = None
@@ -57,6 +183,22 @@ class OperationWindow(QMainWindow):
         self.start_road_point = None
         self.end_road_point = None
         self.damage_active = False
+        self._graph_loader: Optional[_GraphLoader] = None
+        # One route search in flight; a request made meanwhile reruns after it.
+        self._route_search: Optional[_RouteSearch] = None
+        self._route_pending = False
+        # Graph edits wait while a route search (or its rerun) or an analysis
+        # comparison reads the graph.
+        self._route_busy = False
+        self._comparison_busy = False
+        # (quantized start/end inputs, start projection, end projection)
+        self._last_resolved: Optional[Tuple[Any, Any, Any]] = None
+        # Seeded disaster scenarios: seed -> (circles, blocked edges, blocked count).
+        self._scenario_cache: Dict[int, Tuple[List[Tuple[float, float, float]], List[Any], int]] = {}
+        # Edge geometry never changes with damage, so entries stay valid per graph.
+        self._nearest_cache: "OrderedDict[Tuple[int, int], Tuple[float, float, Any]]" = (
+            OrderedDict()
+        )
 
         self.operations_page = self._build_operations_page()
         self.analysis_page = self._build_analysis_page()
@@ -128,7 +270,20 @@ class OperationWindow(QMainWindow):
         self.reset_damage_button.clicked.connect(self._reset_damages)
 
         self.random_disaster_button = QPushButton("Rastgele Deprem Simülasyonu")
-        self.random_disaster_button.clicked.connect(self._simulate_random_disaster)
+        # Scenario seed: 0 ("Rastgele") draws a fresh scenario; any other value
+        # repeats the same damage and is replayed from _scenario_cache.
+        self.seed_input = QSpinBox()
+        self.seed_input.setRange(0, 999999)
+        self.seed_input.setSpecialValueText("Rastgele")
+        self.seed_input.setToolTip("Senaryo tohumu: aynı tohum aynı hasarı üretir")
+        self.random_disaster_button.clicked.connect(
+            lambda: self._simulate_random_disaster(self.seed_input.value() or None)
+        )
+
+        self.algorithm_combo = QComboBox()
+        for mode, (name, _) in _ALGORITHMS.items():
+            self.algorithm_combo.addItem(name, mode)
+        self.algorithm_combo.currentIndexChanged.connect(self._on_algorithm_changed)
 
         self.compute_button = QPushButton("ROTA HESAPLA")
         self.compute_button.setMinimumHeight(48)
@@ -136,6 +291,14 @@ class OperationWindow(QMainWindow):
 
         self.log_view = QTextEdit()
         self.log_view.setReadOnly(True)
+        self.log_view.document().setMaximumBlockCount(_LOG_MAX_BLOCKS)
+        # Appends would otherwise pile up undo commands nobody can trigger.
+        self.log_view.setUndoRedoEnabled(False)
+        self._log_buffer: List[str] = []
+        self._log_timer = QTimer(self)
+        self._log_timer.setSingleShot(True)
+        self._log_timer.setInterval(_LOG_FLUSH_MS)
+        self._log_timer.timeout.connect(self._flush_log)
 
         vbox.addWidget(self.start_input)
         vbox.addWidget(self.start_select_btn)
@@ -144,25 +307,25 @@ class OperationWindow(QMainWindow):
         vbox.addWidget(self.analysis_button)
         vbox.addWidget(self.damage_button)
         vbox.addWidget(self.reset_damage_button)
-        vbox.addWidget(self.random_disaster_button)
+        disaster_row = QHBoxLayout()
+        disaster_row.addWidget(self.random_disaster_button, 1)
+        disaster_row.addWidget(self.seed_input)
+        vbox.addLayout(disaster_row)
+        vbox.addWidget(self.algorithm_combo)
         vbox.addWidget(self.compute_button)
         vbox.addWidget(self.log_view, 1)
 
         return panel
 
     def _build_analysis_page(self) -> QWidget:
+        # The dashboard (and QtWebEngine) is created on first use in _open_analysis.
         page = QWidget()
-        layout = QVBoxLayout(page)
-        self.analysis_view = AnalysisWindow()
-        layout.addWidget(self.analysis_view)
+        QVBoxLayout(page)
+        self.analysis_view: Optional[AnalysisWindow] = None
         return page
 
     def _parse_point(self, text: str) -> Optional[GeoPoint]:
-        try:
-            lat_str, lon_str = [part.strip() for part in text.split(",", maxsplit=1)]
-            return GeoPoint(lat=float(lat_str), lon=float(lon_str))
-        except Exception:
-            return None
+        return _parse_geo_text(text)
 
     def _enable_start_pick(self) -> None:
         self._pick_mode = "start"
@@ -179,32 +342,44 @@ class OperationWindow(QMainWindow):
         self._log("Haritada bitiş noktası seçin.")
 
     def _ensure_graph_loaded(self) -> None:
+        """Start loading the graph in the background unless it is loaded or loading."""
         if self.graph is not None and self.transformer is not None:
             return
+        if self._graph_loader is not None:
+            self._log("Harita hâlâ yükleniyor...")
+            return
 
         self._log(f"Grafik indiriliyor: {DEFAULT_LOCATION}")
+        loader = _GraphLoader(DEFAULT_LOCATION)
+        loader.signals.log.connect(self._log)
+        loader.signals.finished.connect(self._on_graph_loaded)
+        loader.signals.failed.connect(self._on_graph_failed)
+        self._graph_loader = loader
+        QThreadPool.globalInstance().start(loader)
+
+    def _on_graph_loaded(self, graph: Any, buildings: Any, transformer: Any) -> None:
+        self._graph_loader = None
+        self.graph = graph
+        self.buildings = buildings
+        self.transformer = transformer
+        self._nearest_cache.clear()
+        self._last_resolved = None
+        self._scenario_cache.clear()
         try:
-            graph = load_graph(DEFAULT_LOCATION)
-            self.graph = graph
-            try:
-                bld = load_buildings(DEFAULT_LOCATION)
-                if getattr(bld, "crs", None) and bld.crs and not bld.crs.is_geographic:
-                    bld = bld.to_crs("EPSG:4326")
-                self.buildings = bld
-                self._log(f"Bina verisi yüklendi: {len(bld)} kayıt; CRS={bld.crs}")
-            except Exception as exc:
-                self._log(f"Bina verisi yüklenemedi: {exc}")
-            self.transformer = CoordinateTransformer(
-                graph,
-                screen_width=int(WINDOW_SIZE[0] * 0.7),
-                screen_height=WINDOW_SIZE[1],
-            )
             self.map_view.render_map(self.graph, self.buildings, self.transformer)
             self._log("Harita yüklendi ve etkileşim hazır.")
         except Exception as exc:
             self._log(f"Harita yüklenemedi: {exc}")
 
+    def _on_graph_failed(self, message: str) -> None:
+        self._graph_loader = None
+        self._log(f"Harita yüklenemedi: {message}")
+
     def run_algorithm(self) -> None:
+        if self._route_search is not None:
+            self._route_pending = True
+            return
+
         start = self._parse_point(self.start_input.text())
         end = self._parse_point(self.end_input.text())
 
@@ -220,18 +395,82 @@ class OperationWindow(QMainWindow):
             if not self.damage_active:
                 reset_graph_state(self.graph)
 
-            if self.current_algorithm == "astar":
-                path, visited, total_dist, success = astar_search(
-                    self.graph, self.start_node, self.end_node
-                )
-                color = "#27ae60"
-                algo_name = "A*"
-            else:
-                path, visited, total_dist, success = dijkstra_search(
-                    self.graph, self.start_node, self.end_node
-                )
-                color = "#e74c3c"
-                algo_name = "Dijkstra"
+            context = {
+                "algorithm": self.current_algorithm,
+                "start_click_point": self.start_click_coord,
+                "start_road_point": self.start_road_point,
+                "start_node": self.start_node,
+                "end_click_point": self.end_click_coord,
+                "end_road_point": self.end_road_point,
+                "end_node": self.end_node,
+            }
+            search = _RouteSearch(self.graph, self.current_algorithm, context)
+        except Exception as exc:  # pragma: no cover - user environment dependent
+            self._log(f"Rota hesaplanamadı: {exc}")
+            return
+
+        search.signals.finished.connect(self._on_route_found)
+        search.signals.failed.connect(self._on_route_failed)
+        self._route_search = search
+        self._set_route_busy(True)
+        QThreadPool.globalInstance().start(search)
+
+    def _on_algorithm_changed(self, index: int) -> None:
+        self.current_algorithm = self.algorithm_combo.itemData(index)
+
+    def _finish_route_search(self) -> bool:
+        """Clear the in-flight search; True if its result is still current."""
+        search, self._route_search = self._route_search, None
+        # Damage applied during the search makes its result stale.
+        stale = search is None or search.graph is not self.graph or (
+            search.version != graph_version(self.graph)
+        )
+        if self._route_pending or stale:
+            self._route_pending = False
+            # Controls stay disabled until the rerun starts, so no damage
+            # flow can slip in between and have its route overdrawn.
+            QTimer.singleShot(0, self._rerun_route_search)
+            return False
+        self._set_route_busy(False)
+        return True
+
+    def _rerun_route_search(self) -> None:
+        self._set_route_busy(False)
+        self.run_algorithm()
+
+    def _set_route_busy(self, busy: bool) -> None:
+        self._route_busy = busy
+        self._sync_busy_controls()
+
+    def _set_comparison_busy(self, busy: bool) -> None:
+        self._comparison_busy = busy
+        self._sync_busy_controls()
+
+    def _sync_busy_controls(self) -> None:
+        # Damage, reset and the disaster scenario change the graph (the
+        # scenario also draws its own route); routing may reset stale damage.
+        # All of them wait for in-flight searches and comparisons.
+        idle = not (self._route_busy or self._comparison_busy)
+        for button in (
+            self.compute_button,
+            self.damage_button,
+            self.reset_damage_button,
+            self.random_disaster_button,
+        ):
+            button.setEnabled(idle)
+
+    def _on_route_failed(self, message: str) -> None:
+        if self._finish_route_search():
+            self._log(f"Rota hesaplanamadı: {message}")
+
+    def _on_route_found(self, result: Any) -> None:
+        context = self._route_search.context
+        if not self._finish_route_search():
+            return
+
+        path, visited, total_dist, success = result
+        try:
+            algo_name, color = _ALGORITHMS[context["algorithm"]]
 
             if not path:
                 QMessageBox.warning(self, "Uyarı", "Bu iki nokta arasında karayolu bağlantısı yok!")
@@ -239,16 +478,16 @@ class OperationWindow(QMainWindow):
                 return
 
             walk_start = self._walk_distance(
-                self.start_click_coord, self.start_road_point, self.start_node
+                context["start_click_point"], context["start_road_point"], context["start_node"]
             )
             walk_end = self._walk_distance(
-                self.end_click_coord, self.end_road_point, self.end_node
+                context["end_click_point"], context["end_road_point"], context["end_node"]
             )
             real_total_dist = total_dist + walk_start + walk_end
 
             end_road_pos = None
             if success:
-                end_road_pos = self.end_road_point
+                end_road_pos = context["end_road_point"]
             else:
                 QMessageBox.warning(
                     self,
@@ -261,12 +500,12 @@ class OperationWindow(QMainWindow):
                 path,
                 color,
                 self.transformer,
-                start_click_point=self.start_click_coord,
-                start_road_point=self.start_road_point,
-                start_node=self.start_node,
-                end_click_point=self.end_click_coord,
-                end_road_point=self.end_road_point,
-                end_node=self.end_node,
+                start_click_point=context["start_click_point"],
+                start_road_point=context["start_road_point"],
+                start_node=context["start_node"],
+                end_click_point=context["end_click_point"],
+                end_road_point=context["end_road_point"],
+                end_node=context["end_node"],
                 end_road_pos=end_road_pos,
                 success=success,
             )
@@ -294,7 +533,7 @@ class OperationWindow(QMainWindow):
 
         lat, lon = self.transformer.screen_to_geo(x, y)
         try:
-            proj_lat, proj_lon, node_id = get_nearest_edge_point(self.graph, lat, lon)
+            proj_lat, proj_lon, node_id = self._cached_nearest(lat, lon)
         except ValueError:
             QMessageBox.warning(self, "Uyarı", "Lütfen bir yola yakın tıklayın!")
             return
@@ -328,6 +567,10 @@ class OperationWindow(QMainWindow):
         )
 
     def _open_analysis(self, run: bool = False) -> None:
+        if self.analysis_view is None:
+            self.analysis_view = AnalysisWindow()
+            self.analysis_view.comparison_busy.connect(self._set_comparison_busy)
+            self.analysis_page.layout().addWidget(self.analysis_view)
         self.stacked.setCurrentIndex(1)
         if run and self.graph is not None and self.start_node is not None and self.end_node is not None:
             self.analysis_view.start_comparison_test(self.graph, self.start_node, self.end_node)
@@ -346,6 +589,9 @@ class OperationWindow(QMainWindow):
         if not self.transformer or not self.graph:
             self._log("Harita henüz yüklenmedi.")
             return
+        if self._route_busy or self._comparison_busy:
+            self._log("Rota/analiz hesaplanırken hasar uygulanamaz.")
+            return
 
         lat, lon = self.transformer.screen_to_geo(x, y)
         try:
@@ -378,24 +624,31 @@ class OperationWindow(QMainWindow):
         self.start_click_coord = (start.lat, start.lon)
         self.end_click_coord = (end.lat, end.lon)
 
-        try:
-            s_proj_lat, s_proj_lon, start_node = get_nearest_edge_point(
-                self.graph, start.lat, start.lon
-            )
-            e_proj_lat, e_proj_lon, end_node = get_nearest_edge_point(
-                self.graph, end.lat, end.lon
+        inputs_key = (_coord_key(start.lat, start.lon), _coord_key(end.lat, end.lon))
+        last = self._last_resolved
+        if last is not None and last[0] == inputs_key:
+            # Same inputs as the last successful resolve: reuse its projections.
+            (s_proj_lat, s_proj_lon, start_node), (e_proj_lat, e_proj_lon, end_node) = last[1:]
+        else:
+            try:
+                s_proj_lat, s_proj_lon, start_node = self._cached_nearest(start.lat, start.lon)
+                e_proj_lat, e_proj_lon, end_node = self._cached_nearest(end.lat, end.lon)
+            except ValueError:
+                QMessageBox.warning(self, "Uyarı", "Lütfen bir yola yakın tıklayın!")
+                return False
+            except Exception as exc:
+                self._log(f"En yakın yol bulunamadı: {exc}")
+                QMessageBox.warning(self, "Uyarı", "Lütfen bir yola yakın tıklayın!")
+                return False
+
+            if start_node is None or end_node is None:
+                QMessageBox.warning(self, "Uyarı", "Lütfen bir yola yakın tıklayın!")
+                return False
+            self._last_resolved = (
+                inputs_key,
+                (s_proj_lat, s_proj_lon, start_node),
+                (e_proj_lat, e_proj_lon, end_node),
             )
-        except ValueError:
-            QMessageBox.warning(self, "Uyarı", "Lütfen bir yola yakın tıklayın!")
-            return False
-        except Exception as exc:
-            self._log(f"En yakın yol bulunamadı: {exc}")
-            QMessageBox.warning(self, "Uyarı", "Lütfen bir yola yakın tıklayın!")
-            return False
-
-        if start_node is None or end_node is None:
-            QMessageBox.warning(self, "Uyarı", "Lütfen bir yola yakın tıklayın!")
-            return False
 
         self.start_node = start_node
         self.end_node = end_node
@@ -410,7 +663,20 @@ class OperationWindow(QMainWindow):
             )
         return True
 
-    def _simulate_random_disaster(self) -> None:
+    def _cached_nearest(self, lat: float, lon: float) -> Tuple[float, float, Any]:
+        """get_nearest_edge_point memoized on the quantized click coordinate."""
+        key = _coord_key(lat, lon)
+        hit = self._nearest_cache.get(key)
+        if hit is not None:
+            self._nearest_cache.move_to_end(key)
+            return hit
+        result = get_nearest_edge_point(self.graph, lat, lon)
+        self._nearest_cache[key] = result
+        if len(self._nearest_cache) > _NEAREST_CACHE_SIZE:
+            self._nearest_cache.popitem(last=False)
+        return result
+
+    def _simulate_random_disaster(self, seed: Optional[int] = None) -> None:
         start = self._parse_point(self.start_input.text())
         end = self._parse_point(self.end_input.text())
 
@@ -431,25 +697,31 @@ class OperationWindow(QMainWindow):
         self.damage_active = True  # Simulation will keep damage state active
 
         # Apply scattered micro damages first so ghost path can show red overlaps.
-        damages = simulate_scattered_damage(self.graph, count=10)
-        total_blocked = 0
-        for lat, lon, radius, _ in damages:
-            blocked_edges = apply_damage_area(self.graph, lat, lon, radius)
-            total_blocked += len(blocked_edges)
-            try:
-                self.map_view.draw_damage_circle(self.transformer, lat, lon, radius)
-            except Exception:
-                pass
+        cached = self._scenario_cache.get(seed) if seed is not None else None
+        if cached is not None:
+            # Replaying a seeded scenario: re-block its edges without rescanning.
+            circles, scenario_edges, total_blocked = cached
+            block_edges(self.graph, scenario_edges)
+        else:
+            damages = simulate_scattered_damage(self.graph, count=10, seed=seed)
+            circles = [(lat, lon, radius) for lat, lon, radius, _ in damages]
+            scenario_edges = set()
+            total_blocked = 0
+            for lat, lon, radius in circles:
+                blocked_edges = apply_damage_area(self.graph, lat, lon, radius)
+                total_blocked += len(blocked_edges)
+                scenario_edges.update(blocked_edges)
+            if seed is not None:
+                self._scenario_cache[seed] = (circles, list(scenario_edges), total_blocked)
+        try:
+            self.map_view.draw_damage_circles(self.transformer, circles)
+        except Exception:
+            pass
 
         # Baseline (ghost) path ignoring damage but colored where blocked.
-        if self.current_algorithm == "astar":
-            ghost_path, _, _, _ = astar_search(
-                self.graph, self.start_node, self.end_node, ignore_damage=True
-            )
-        else:
-            ghost_path, _, _, _ = dijkstra_search(
-                self.graph, self.start_node, self.end_node, ignore_damage=True
-            )
+        ghost_path, _, _, _ = cached_search(
+            self.graph, self.start_node, self.end_node, self.current_algorithm, ignore_damage=True
+        )
         if ghost_path:
             self.map_view.draw_ghost_path(self.graph, ghost_path, self.transformer)
         else:
@@ -457,18 +729,10 @@ class OperationWindow(QMainWindow):
             return
 
         # Now compute damaged path (actual route).
-        if self.current_algorithm == "astar":
-            path, visited, total_dist, success = astar_search(
-                self.graph, self.start_node, self.end_node
-            )
-            color = "#27ae60"
-            algo_name = "A*"
-        else:
-            path, visited, total_dist, success = dijkstra_search(
-                self.graph, self.start_node, self.end_node
-            )
-            color = "#e74c3c"
-            algo_name = "Dijkstra"
+        path, visited, total_dist, success = cached_search(
+            self.graph, self.start_node, self.end_node, self.current_algorithm
+        )
+        algo_name, color = _ALGORITHMS[self.current_algorithm]
 
         if not path:
             QMessageBox.warning(self, "Uyarı", "Hasar sonrası ulaşılabilir yol bulunamadı!")
@@ -511,28 +775,25 @@ class OperationWindow(QMainWindow):
         )
 
     def _log(self, message: str) -> None:
-        self.log_view.append(message)
+        # One append (and relayout) per burst instead of per message.
+        self._log_buffer.append(message)
+        if not self._log_timer.isActive():
+            self._log_timer.start()
+
+    def _flush_log(self) -> None:
+        if self._log_buffer:
+            self.log_view.append("\n".join(self._log_buffer))
+            self._log_buffer.clear()
 
     def _walk_distance(self, click_coord, road_point, node_id) -> float:
         if click_coord is None or road_point is None or node_id is None:
             return 0.0
         try:
-            nlat = self.graph.nodes[node_id].get("y")
-            nlon = self.graph.nodes[node_id].get("x")
-            seg1 = self._haversine(click_coord[0], click_coord[1], road_point[0], road_point[1])
-            seg2 = self._haversine(road_point[0], road_point[1], nlat, nlon)
+            node = self.graph.nodes[node_id]
+            seg1 = _haversine_m(click_coord[0], click_coord[1], road_point[0], road_point[1])
+            seg2 = _haversine_m(road_point[0], road_point[1], node.get("y"), node.get("x"))
             return seg1 + seg2
         except Exception:
             return 0.0
 
-    def _haversine(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-        from math import radians, sin, cos, asin, sqrt
-
-        R = 6371000.0
-        dlat = radians(lat2 - lat1)
-        dlon = radians(lon2 - lon1)
-        a = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
-        c = 2 * asin(sqrt(a))
-        return R * c
-
     # Rendering moved to map_canvas render_map
@@ -2,6 +2,9 @@
 
 from __future__ import annotations
 
+from functools import lru_cache
+
+import numpy as np
 from PyQt6.QtCore import QPointF, Qt, pyqtSignal
 from PyQt6.QtGui import (
     QColor,
@@ -13,7 +16,6 @@ from PyQt6.QtGui import (
     QPolygonF,
     QPainterPath,
 )
-import math
 from PyQt6.QtWidgets import (
     QGraphicsScene,
     QGraphicsView,
@@ -21,8 +23,48 @@ from PyQt6.QtWidgets import (
     QGraphicsEllipseItem,
     QGraphicsPathItem,
     QGraphicsRectItem,
+    QGraphicsItem,
+    QGraphicsItemGroup,
 )
 
+from core.data_manager import blocked_pairs
+
+try:
+    from shapely.geometry import MultiPolygon, Polygon
+except ImportError:  # pragma: no cover - optional dependency
+    MultiPolygon = Polygon = None  # type: ignore
+
+# Static layers are rasterized once per view transform, so overlays (pins,
+# click markers, damage circles) only repaint themselves on top of a blit.
+_DEVICE_CACHE = QGraphicsItem.CacheMode.DeviceCoordinateCache
+
+
+@lru_cache(maxsize=64)
+def _make_pen(
+    color: str,
+    width: int = 1,
+    style: Qt.PenStyle = Qt.PenStyle.SolidLine,
+    round_cap: bool = False,
+) -> QPen:
+    """Cosmetic pen, cached: the same few styles are requested on every draw.
+
+    Items copy the pen they are given, so the shared instance is never modified.
+    """
+    pen = QPen(QColor(color))
+    pen.setWidth(width)
+    pen.setStyle(style)
+    pen.setCosmetic(True)
+    if round_cap:
+        pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+    return pen
+
+
+@lru_cache(maxsize=32)
+def _make_brush(color: str, alpha: int = 255) -> QBrush:
+    qcolor = QColor(color)
+    qcolor.setAlpha(alpha)
+    return QBrush(qcolor)
+
 
 class InteractiveMap(QGraphicsView):
     coordinateClicked = pyqtSignal(float, float)
@@ -43,7 +85,7 @@ class InteractiveMap(QGraphicsView):
         self._click_enabled = False
         self.mode = self.MODE_NAVIGATION
         self.route_items = []
-        self.damage_items = []
+        self._damage_group = None
         self.start_pin = None
         self.end_pin = None
 
@@ -52,54 +94,64 @@ class InteractiveMap(QGraphicsView):
 
         scene = self.scene()
         scene.clear()
+        # clear() deleted every item; drop references to the overlays too.
+        self._click_marker = None
+        self.route_items = []
+        self._damage_group = None
+        self.start_pin = None
+        self.end_pin = None
         scene.setBackgroundBrush(QColor("#000000"))
 
         if not transformer:
             return
 
+        # Fixed scene rect up front: the scene then skips growing its bounding
+        # rect and BSP extent on every item added below.
+        scene.setSceneRect(0, 0, transformer.width, transformer.height)
+
         # 1) Buildings (z=0)
         if buildings is not None and getattr(buildings, "empty", True) is False:
-            brush = QBrush(QColor(44, 62, 80, 180))  # semi-transparent blue-gray
-            border_pen = QPen(QColor("#1abc9c"))
-            border_pen.setWidth(1)
-            border_pen.setCosmetic(True)
-            for geom in buildings.geometry.dropna():
+            brush = _make_brush("#2c3e50", 180)  # semi-transparent blue-gray
+            border_pen = _make_pen("#1abc9c")
+            visible = self._visible_geometries(buildings.geometry.dropna(), transformer)
+            for geom in self._simplified_geometries(visible, transformer):
                 try:
                     for item in self._polygon_items_from_geom(
                         geom, transformer, brush, border_pen
                     ):
                         item.setZValue(0)
+                        item.setCacheMode(_DEVICE_CACHE)
                         scene.addItem(item)
                 except Exception:
                     continue
 
         # 2) Roads (z=1)
         if graph is not None:
-            road_pen = QPen(QColor("#ffffff"))
-            road_pen.setWidth(2)
-            road_pen.setCosmetic(True)
-            road_pen.setCapStyle(Qt.PenCapStyle.RoundCap)
-            for u, v in graph.edges():
-                try:
-                    udata = graph.nodes[u]
-                    vdata = graph.nodes[v]
-                    x1, y1 = transformer.geo_to_screen(udata["y"], udata["x"])
-                    x2, y2 = transformer.geo_to_screen(vdata["y"], vdata["x"])
-                    line = scene.addLine(x1, y1, x2, y2, road_pen)
-                    line.setZValue(1)
-                except Exception:
-                    continue
+            road_pen = _make_pen("#ffffff", 2, round_cap=True)
+            edges = list(graph.edges())
+            if edges:
+                # Endpoints come from the transformer's per-node screen table.
+                us, vs = zip(*edges)
+                x1s, y1s = transformer.node_screen(us).tolist()
+                x2s, y2s = transformer.node_screen(vs).tolist()
+                # One path item for the whole network instead of an item per edge.
+                road_path = QPainterPath()
+                road_path.reserve(2 * len(x1s))
+                for x1, y1, x2, y2 in zip(x1s, y1s, x2s, y2s):
+                    road_path.moveTo(x1, y1)
+                    road_path.lineTo(x2, y2)
+                roads = QGraphicsPathItem(road_path)
+                roads.setPen(road_pen)
+                roads.setZValue(1)
+                roads.setCacheMode(_DEVICE_CACHE)
+                scene.addItem(roads)
 
         # Nodes hidden to keep view clean with cosmetic roads.
 
-        scene.setSceneRect(0, 0, transformer.width, transformer.height)
         self.fitInView(scene.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
 
         # Visual boundary/ruler-like frame to indicate drawable area.
-        frame_pen = QPen(QColor("#555555"))
-        frame_pen.setStyle(Qt.PenStyle.DashLine)
-        frame_pen.setCosmetic(True)
-        frame_pen.setWidth(1)
+        frame_pen = _make_pen("#555555", 1, Qt.PenStyle.DashLine)
         frame = scene.addRect(scene.sceneRect(), frame_pen)
         frame.setZValue(0.5)
 
@@ -136,41 +188,25 @@ class InteractiveMap(QGraphicsView):
         if clear_existing:
             self.clear_route()
 
-        # Driving leg: solid main path.
+        # Driving leg: solid main path, projected in one gather.
+        xs, ys = transformer.node_screen(path_list).tolist()
         painter_path = QPainterPath()
-        first = path_list[0]
-        x0, y0 = transformer.geo_to_screen(graph.nodes[first]["y"], graph.nodes[first]["x"])
-        painter_path.moveTo(x0, y0)
-        for node in path_list[1:]:
-            x, y = transformer.geo_to_screen(graph.nodes[node]["y"], graph.nodes[node]["x"])
-            painter_path.lineTo(x, y)
-
-        drive_pen = QPen(QColor(color))
-        drive_pen.setWidth(4)
-        drive_pen.setCosmetic(True)
-        drive_pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+        x0, y0 = xs[0], ys[0]
+        painter_path.addPolygon(QPolygonF(list(map(QPointF, xs, ys))))
 
-        path_item = QGraphicsPathItem(painter_path)
-        path_item.setPen(drive_pen)
-        path_item.setZValue(3)
-        scene.addItem(path_item)
-        self.route_items.append(path_item)
+        drive_pen = _make_pen(color, 4, round_cap=True)
 
-        # Walking legs: dashed cyan segments.
-        walk_pen = QPen(QColor("#00FFFF"))
-        walk_pen.setStyle(Qt.PenStyle.DashLine)
-        walk_pen.setWidth(2)
-        walk_pen.setCosmetic(True)
-        walk_pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+        # Walking legs: dashed cyan segments, collected into one path item.
+        walk_pen = _make_pen("#00FFFF", 2, Qt.PenStyle.DashLine, round_cap=True)
+        walk_path = QPainterPath()
 
         def add_walk_segment(p1, p2):
             if p1 is None or p2 is None:
                 return
             x1, y1 = transformer.geo_to_screen(p1[0], p1[1])
             x2, y2 = transformer.geo_to_screen(p2[0], p2[1])
-            line = scene.addLine(x1, y1, x2, y2, walk_pen)
-            line.setZValue(3)
-            self.route_items.append(line)
+            walk_path.moveTo(x1, y1)
+            walk_path.lineTo(x2, y2)
 
         # Start side walking: click -> road point -> start node
         add_walk_segment(start_click_point, start_road_point)
@@ -185,9 +221,9 @@ class InteractiveMap(QGraphicsView):
                 en_lat, en_lon = graph.nodes[last_node_id]["y"], graph.nodes[last_node_id]["x"]
                 ex_node, ey_node = transformer.geo_to_screen(en_lat, en_lon)
                 ex_road, ey_road = transformer.geo_to_screen(end_road_pos[0], end_road_pos[1])
-                tail_drive = scene.addLine(ex_node, ey_node, ex_road, ey_road, drive_pen)
-                tail_drive.setZValue(3)
-                self.route_items.append(tail_drive)
+                # Driving tail joins the main path item as its own subpath.
+                painter_path.moveTo(ex_node, ey_node)
+                painter_path.lineTo(ex_road, ey_road)
                 add_walk_segment(end_road_pos, end_click_point)
             except Exception:
                 add_walk_segment(end_road_point, end_click_point)
@@ -196,11 +232,7 @@ class InteractiveMap(QGraphicsView):
                 en_lat, en_lon = graph.nodes[last_node_id]["y"], graph.nodes[last_node_id]["x"]
                 ex_node, ey_node = transformer.geo_to_screen(en_lat, en_lon)
                 ex_pin, ey_pin = transformer.geo_to_screen(end_click_point[0], end_click_point[1])
-                dotted_pen = QPen(QColor("#e53935"))
-                dotted_pen.setStyle(Qt.PenStyle.DotLine)
-                dotted_pen.setWidth(2)
-                dotted_pen.setCosmetic(True)
-                dotted_pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+                dotted_pen = _make_pen("#e53935", 2, Qt.PenStyle.DotLine, round_cap=True)
                 line = scene.addLine(ex_node, ey_node, ex_pin, ey_pin, dotted_pen)
                 line.setZValue(3.2)
                 self.route_items.append(line)
@@ -209,17 +241,29 @@ class InteractiveMap(QGraphicsView):
         else:
             add_walk_segment(end_road_point, end_click_point)
 
+        path_item = QGraphicsPathItem(painter_path)
+        path_item.setPen(drive_pen)
+        path_item.setZValue(3)
+        path_item.setCacheMode(_DEVICE_CACHE)
+        scene.addItem(path_item)
+        self.route_items.append(path_item)
+
+        if not walk_path.isEmpty():
+            walk_item = QGraphicsPathItem(walk_path)
+            walk_item.setPen(walk_pen)
+            walk_item.setZValue(3)
+            scene.addItem(walk_item)
+            self.route_items.append(walk_item)
+
         # Markers for start/end
-        marker_pen = QPen(Qt.PenStyle.NoPen)
-        marker_brush_start = QBrush(QColor("#27ae60"))
-        marker_brush_end = QBrush(QColor("#e74c3c"))
+        marker_pen = _make_pen("#000000", 1, Qt.PenStyle.NoPen)
+        marker_brush_start = _make_brush("#27ae60")
+        marker_brush_end = _make_brush("#e74c3c")
         size = 8
         half = size / 2
 
         sx, sy = x0, y0
-        ex, ey = transformer.geo_to_screen(
-            graph.nodes[path_list[-1]]["y"], graph.nodes[path_list[-1]]["x"]
-        )
+        ex, ey = xs[-1], ys[-1]
 
         start_marker = QGraphicsEllipseItem(sx - half, sy - half, size, size)
         start_marker.setPen(marker_pen)
@@ -235,18 +279,56 @@ class InteractiveMap(QGraphicsView):
         scene.addItem(end_marker)
         self.route_items.append(end_marker)
 
-    def _polygon_items_from_geom(self, geom, transformer, brush, pen):
+    def _visible_geometries(self, geoms, transformer):
+        """Geometries meeting the drawable area, via the GeoSeries spatial index.
+
+        Buildings fetched for the place often spill past the road network's
+        extent; those would only be scene items nobody sees. Falls back to all
+        geometries when no spatial index is available.
+        """
         try:
-            from shapely.geometry import Polygon, MultiPolygon
+            from shapely.geometry import box
+
+            area = box(*transformer.screen_to_geo_bbox(0, 0, transformer.width, transformer.height))
+            hits = geoms.sindex.query(area, predicate="intersects")
+            # Keep the original (paint) order.
+            return geoms.iloc[np.sort(hits)]
         except Exception:
+            return geoms
+
+    def _simplified_geometries(self, geoms, transformer):
+        """Douglas-Peucker simplify geometries to half a scene pixel.
+
+        Vertices are truncated to whole scene pixels anyway, so detail below
+        that tolerance never reaches the screen; dropping it first saves the
+        projection and paint work. Geometries that would collapse keep their
+        original shape.
+        """
+        try:
+            import shapely
+
+            original = np.asarray(list(geoms), dtype=object)
+            simplified = shapely.simplify(original, 0.5 / transformer.scale)
+            collapsed = shapely.is_empty(simplified) | ~shapely.is_valid(simplified)
+            simplified[collapsed] = original[collapsed]
+            return simplified
+        except Exception:
+            return geoms
+
+    def _polygon_items_from_geom(self, geom, transformer, brush, pen):
+        if Polygon is None:
             return []
 
         def build_polygon(coords):
-            poly = QPolygonF()
-            for lon, lat in coords:
-                x, y = transformer.geo_to_screen(lat, lon)
-                poly.append(QPointF(x, y))
-            pen.setCosmetic(True)
+            # Project the whole ring in one vectorized call.
+            lonlat = np.asarray(coords, dtype=np.float64)
+            xs, ys = (
+                transformer.geo_to_screen_vec(lonlat[:, 1], lonlat[:, 0]).tolist()
+                if lonlat.size
+                else ([], [])
+            )
+            # Build the polygon in one shot instead of growing it per vertex.
+            poly = QPolygonF(list(map(QPointF, xs, ys)))
             item = QGraphicsPolygonItem(poly)
             item.setBrush(brush)
             item.setPen(pen)
@@ -296,55 +378,64 @@ class InteractiveMap(QGraphicsView):
         size = 10
         half = size / 2
         marker = QGraphicsEllipseItem(pos.x() - half, pos.y() - half, size, size)
-        pen = QPen(QColor("#f1c40f"))
-        pen.setCosmetic(True)
-        marker.setPen(pen)
-        marker.setBrush(QBrush(QColor(241, 196, 15, 160)))
+        marker.setPen(_make_pen("#f1c40f"))
+        marker.setBrush(_make_brush("#f1c40f", 160))
         marker.setZValue(5)
         scene.addItem(marker)
         self._click_marker = marker
 
+    def _damage_layer(self) -> QGraphicsItemGroup:
+        # Damage overlays hang off one group, so clearing them is a single
+        # removeItem however many markers have piled up. Children attach with
+        # setParentItem: the group paints nothing itself, so addToGroup's
+        # per-child bounding-rect bookkeeping would be wasted.
+        if self._damage_group is None:
+            self._damage_group = QGraphicsItemGroup()
+            self._damage_group.setZValue(4.2)
+            self.scene().addItem(self._damage_group)
+        return self._damage_group
+
     def draw_damage_marker(self, x: float, y: float) -> None:
-        scene = self.scene()
         size = 16
         half = size / 2
         marker = QGraphicsEllipseItem(x - half, y - half, size, size)
-        pen = QPen(QColor("#e53935"))
-        pen.setCosmetic(True)
-        pen.setWidth(2)
-        marker.setPen(pen)
-        marker.setBrush(QBrush(QColor(229, 57, 53, 120)))
+        marker.setPen(_make_pen("#e53935", 2))
+        marker.setBrush(_make_brush("#e53935", 120))
         marker.setZValue(4.5)
-        scene.addItem(marker)
-        self.damage_items.append(marker)
+        marker.setParentItem(self._damage_layer())
 
     def draw_damage_circle(self, transformer, center_lat: float, center_lon: float, radius_m: float) -> None:
-        if transformer is None:
+        self.draw_damage_circles(transformer, [(center_lat, center_lon, radius_m)])
+
+    def draw_damage_circles(self, transformer, circles) -> None:
+        """Add several (lat, lon, radius_m) damage circles with a single repaint."""
+        if transformer is None or not circles:
             return
         try:
-            cx, cy = transformer.geo_to_screen(center_lat, center_lon)
-            # Approximate radius in screen space using local degree offsets.
-            delta_lat = radius_m / 111320.0
-            denom = max(0.0001, abs(math.cos(math.radians(center_lat))))
-            delta_lon = radius_m / (111320.0 * denom)
-            rx, ry = transformer.geo_to_screen(center_lat + delta_lat, center_lon)
-            radius_px = abs(ry - cy)
-            if radius_px <= 0:
-                radius_px = 5
+            lats, lons, radii = np.asarray(circles, dtype=np.float64).reshape(-1, 3).T
+            # Centers and circle tops projected in two batch calls; the radius
+            # in pixels is approximated from the local latitude offset.
+            centers = transformer.geo_to_screen_vec(lats, lons)
+            tops = transformer.geo_to_screen_vec(lats + radii / 111320.0, lons)
         except Exception:
             return
+        radius_px = np.abs(tops[1] - centers[1])
+        radius_px[radius_px <= 0] = 5
 
-        scene = self.scene()
-        diameter = radius_px * 2
-        circle = QGraphicsEllipseItem(cx - radius_px, cy - radius_px, diameter, diameter)
-        pen = QPen(QColor(229, 57, 53))
-        pen.setWidth(2)
-        pen.setCosmetic(True)
-        circle.setPen(pen)
-        circle.setBrush(QBrush(QColor(229, 57, 53, 100)))
-        circle.setZValue(4.2)
-        scene.addItem(circle)
-        self.damage_items.append(circle)
+        pen = _make_pen("#e53935", 2)
+        brush = _make_brush("#e53935", 100)
+
+        layer = self._damage_layer()
+        self.setUpdatesEnabled(False)
+        try:
+            for cx, cy, r in zip(*centers.tolist(), radius_px.tolist()):
+                circle = QGraphicsEllipseItem(cx - r, cy - r, r * 2, r * 2)
+                circle.setPen(pen)
+                circle.setBrush(brush)
+                circle.setZValue(4.2)
+                circle.setParentItem(layer)
+        finally:
+            self.setUpdatesEnabled(True)
 
     def create_pin_item(self, x: float, y: float) -> QGraphicsPathItem:
         r = 8
@@ -358,29 +449,28 @@ class InteractiveMap(QGraphicsView):
         path.closeSubpath()
 
         item = QGraphicsPathItem(path)
-        pen = QPen(QColor("#000000"))
-        pen.setWidth(1)
-        pen.setCosmetic(True)
-        item.setPen(pen)
-        item.setBrush(QBrush(QColor("#FF0000")))
+        item.setPen(_make_pen("#000000"))
+        item.setBrush(_make_brush("#FF0000"))
         item.setPos(x, y)
         item.setZValue(10)
         return item
 
     def update_markers(self, transformer, start_pos=None, end_pos=None) -> None:
-        scene = self.scene()
         if start_pos is not None:
-            if self.start_pin:
-                scene.removeItem(self.start_pin)
             sx, sy = transformer.geo_to_screen(start_pos[0], start_pos[1])
-            self.start_pin = self.create_pin_item(sx, sy)
-            scene.addItem(self.start_pin)
+            self.start_pin = self._place_pin(self.start_pin, sx, sy)
         if end_pos is not None:
-            if self.end_pin:
-                scene.removeItem(self.end_pin)
             ex, ey = transformer.geo_to_screen(end_pos[0], end_pos[1])
-            self.end_pin = self.create_pin_item(ex, ey)
-            scene.addItem(self.end_pin)
+            self.end_pin = self._place_pin(self.end_pin, ex, ey)
+
+    def _place_pin(self, pin, x: float, y: float) -> QGraphicsPathItem:
+        # Pins keep their item across picks; moving one is a setPos.
+        if pin is None:
+            pin = self.create_pin_item(x, y)
+            self.scene().addItem(pin)
+        else:
+            pin.setPos(x, y)
+        return pin
 
     def clear_route(self) -> None:
         scene = self.scene()
@@ -392,44 +482,41 @@ class InteractiveMap(QGraphicsView):
         self.route_items = []
 
     def clear_damages(self) -> None:
-        scene = self.scene()
-        for item in self.damage_items:
-            try:
-                scene.removeItem(item)
-            except Exception:
-                continue
-        self.damage_items = []
+        # Removing the group takes every marker with it; a fresh one is made
+        # on the next draw.
+        if self._damage_group is not None:
+            self.scene().removeItem(self._damage_group)
+            self._damage_group = None
 
     def draw_ghost_path(self, graph, path_list, transformer) -> None:
         if not graph or not transformer or not path_list or len(path_list) < 2:
             return
         scene = self.scene()
         # Do not clear route; ghost overlays with existing.
-        for u, v in zip(path_list, path_list[1:]):
-            try:
-                x1, y1 = transformer.geo_to_screen(graph.nodes[u]["y"], graph.nodes[u]["x"])
-                x2, y2 = transformer.geo_to_screen(graph.nodes[v]["y"], graph.nodes[v]["x"])
-            except Exception:
+        xs, ys = transformer.node_screen(path_list).tolist()
+        blocked_set = blocked_pairs(graph)
+        # Segments are gathered into one path per state (blocked / open) so
+        # the ghost is two scene items however long the route is.
+        paths = {True: QPainterPath(), False: QPainterPath()}
+        for i, (u, v) in enumerate(zip(path_list, path_list[1:])):
+            # Damage blocks every parallel edge of a pair, so one set probe
+            # per segment (u -> v, or v -> u when only that exists) suffices.
+            blocked = ((u, v) if graph.has_edge(u, v) else (v, u)) in blocked_set
+            paths[blocked].moveTo(xs[i], ys[i])
+            paths[blocked].lineTo(xs[i + 1], ys[i + 1])
+
+        for blocked, ghost in paths.items():
+            if ghost.isEmpty():
                 continue
-
-            edge_info = graph.get_edge_data(u, v) or graph.get_edge_data(v, u)
-            blocked = False
-            if edge_info:
-                try:
-                    blocked = any(data.get("blocked", False) for data in edge_info.values())
-                except Exception:
-                    blocked = False
-
-            pen = QPen(QColor("#e53935" if blocked else "#555555"))
-            pen.setStyle(Qt.PenStyle.DashLine)
-            pen.setWidth(3)
-            pen.setCosmetic(True)
-            pen.setCapStyle(Qt.PenCapStyle.RoundCap)
-
-            segment = scene.addLine(x1, y1, x2, y2, pen)
-            segment.setOpacity(0.8 if blocked else 0.5)
-            segment.setZValue(2.5)
-            self.route_items.append(segment)
+            pen = _make_pen(
+                "#e53935" if blocked else "#555555", 3, Qt.PenStyle.DashLine, round_cap=True
+            )
+            item = QGraphicsPathItem(ghost)
+            item.setPen(pen)
+            item.setOpacity(0.8 if blocked else 0.5)
+            item.setZValue(2.5)
+            scene.addItem(item)
+            self.route_items.append(item)
 
     def draw_dotted_connector(self, transformer, start_geo, end_geo) -> None:
         if transformer is None or start_geo is None or end_geo is None:
@@ -440,11 +527,7 @@ class InteractiveMap(QGraphicsView):
         except Exception:
             return
         scene = self.scene()
-        pen = QPen(QColor("#e53935"))
-        pen.setStyle(Qt.PenStyle.DotLine)
-        pen.setWidth(2)
-        pen.setCosmetic(True)
-        pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+        pen = _make_pen("#e53935", 2, Qt.PenStyle.DotLine, round_cap=True)
         line = scene.addLine(x1, y1, x2, y2, pen)
         line.setZValue(3.2)
         self.route_items.append(line)